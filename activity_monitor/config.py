@@ -2,9 +2,50 @@
 Configuration management for Activity Monitor
 """
 
+import hashlib
+import json
 import os
+import threading
+import time
 import yaml
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+
+# Prefer the LibYAML-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _LOADER, CSafeDumper as _DUMPER
+except ImportError:
+    from yaml import SafeLoader as _LOADER, SafeDumper as _DUMPER
+
+
+class _ConfigDumper(_DUMPER):
+    """Dumper with save_config's block style and 2-space indent built in."""
+
+    def __init__(self, stream, default_flow_style=False, indent=None, **kwargs):
+        super().__init__(
+            stream,
+            default_flow_style=default_flow_style,
+            indent=2 if indent is None else indent,
+            **kwargs,
+        )
+
+
+# Optional msgspec for the JSON sidecar - fall back to the stdlib json module
+try:
+    import msgspec
+
+    _json_decode = msgspec.json.decode
+    _json_encode = msgspec.json.encode
+    _JSON_ERRORS = (ValueError, TypeError, msgspec.MsgspecError)
+except ImportError:
+    _json_decode = json.loads
+    _JSON_ERRORS = (ValueError, TypeError)
+
+    def _json_encode(obj):
+        return json.dumps(obj).encode("utf-8")
+
 
 DEFAULT_CONFIG = {
     "log_dir": "~/Desktop/notes/time_log",
@@ -21,35 +62,325 @@ DEFAULT_CONFIG = {
     "goals": {"daily_hours": 8, "weekly_commits": 20, "monthly_repos": 2},
 }
 
+# Expand "~" once here rather than in every consumer
+for _key in ("log_dir", "monitor_path"):
+    DEFAULT_CONFIG[_key] = os.path.expanduser(DEFAULT_CONFIG[_key])
+del _key
+
+
+def _freeze(config):
+    """Return a read-only view of a config mapping and its nested mappings."""
+    return MappingProxyType(
+        {
+            key: _freeze(value) if isinstance(value, Mapping) else value
+            for key, value in config.items()
+        }
+    )
+
+
+# Read-only view returned when no config file exists, so callers can share it
+# without copying and cannot corrupt DEFAULT_CONFIG by accident
+_DEFAULT_CONFIG_FROZEN = _freeze(DEFAULT_CONFIG)
+
+# Candidate config files, in priority order
+_USER_CONFIG_DIR = Path.home() / ".config" / "activity-monitor"
+# JSON sidecars of parsed configs live here, never next to the YAML itself
+_SIDECAR_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "activity-monitor"
+)
+_CONFIG_PATHS = (
+    _USER_CONFIG_DIR / "config.yaml",
+    Path(__file__).resolve().parent.parent / "config.yaml",
+)
+
+
+class DatabaseConfig(NamedTuple):
+    backup_interval: int
+    max_backups: int
+
+
+class NotificationsConfig(NamedTuple):
+    enabled: bool
+    sound: bool
+    show_productivity: bool
+
+
+class ProductivityConfig(NamedTuple):
+    minimum_session_time: int
+    file_change_weight: float
+    line_change_weight: float
+
+
+class GoalsConfig(NamedTuple):
+    daily_hours: float
+    weekly_commits: int
+    monthly_repos: int
+
+
+class Config(NamedTuple):
+    """Immutable, attribute-access view of the known config keys."""
+
+    log_dir: str
+    idle_threshold: int
+    scan_interval: int
+    monitor_path: str
+    database: DatabaseConfig
+    notifications: NotificationsConfig
+    productivity: ProductivityConfig
+    goals: GoalsConfig
+
+    def as_dict(self):
+        """Return the config as nested plain dicts (e.g. for save_config)."""
+        return {
+            key: value._asdict() if isinstance(value, tuple) else value
+            for key, value in self._asdict().items()
+        }
+
+
+_SECTION_TYPES = {
+    "database": DatabaseConfig,
+    "notifications": NotificationsConfig,
+    "productivity": ProductivityConfig,
+    "goals": GoalsConfig,
+}
+
+# Parsed configs keyed by path: {path: (st_mtime_ns, st_size, config)}
+_CONFIG_CACHE = {}
+_CONFIG_LOCK = threading.Lock()
+
+# Candidate paths recently found missing: {path: time.monotonic() of the miss}.
+# Entries expire so a config file created later is still picked up.
+_MISSING = {}
+_MISSING_TTL = 5.0
+
+# (config mapping, Config built from it) from the last load_settings call
+_SETTINGS_CACHE = None
+
+# Directories save_config has already created during this process
+_ENSURED_DIRS = set()
+
 
 def load_config():
-    """Load configuration from file or create default."""
-    config_paths = [
-        Path.home() / ".config" / "activity-monitor" / "config.yaml",
-        Path(__file__).parent.parent / "config.yaml",
-    ]
-
-    for config_path in config_paths:
-        if config_path.exists():
-            with open(config_path) as f:
-                user_config = yaml.safe_load(f)
-
-            # Merge with defaults
-            
-            config = DEFAULT_CONFIG.copy()
-            config.update(user_config)
-            return config
+    """Load configuration from file or create default.
+
+    The result is cached and shared between callers, so it is a read-only
+    view, nested sections included; copy it before changing anything. When
+    no config file exists a view of the defaults is returned.
+    """
+    now = time.monotonic()
+    for config_path in _CONFIG_PATHS:
+        missed_at = _MISSING.get(config_path)
+        if missed_at is not None and now - missed_at < _MISSING_TTL:
+            continue
+
+        # One stat per candidate is the floor here: its mtime/size feed the
+        # cache check, so listing the directory with os.scandir first would
+        # only add opendir/getdents calls on top of the same stat
+        try:
+            st = os.stat(config_path)
+        except FileNotFoundError:
+            _MISSING[config_path] = now
+            continue
+        _MISSING.pop(config_path, None)
+
+        with _CONFIG_LOCK:
+            cached = _CONFIG_CACHE.get(config_path)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                return cached[2]
+
+        try:
+            user_config = _read_user_config(config_path, st)
+        except FileNotFoundError:
+            # Removed between the stat and the read
+            continue
+
+        # Merge with defaults; frozen like the defaults, since every later
+        # caller shares this object through the cache
+        config = _freeze(_merge(DEFAULT_CONFIG, user_config or {}))
+
+        with _CONFIG_LOCK:
+            _CONFIG_CACHE[config_path] = (st.st_mtime_ns, st.st_size, config)
+        return config
 
     # No config found, return defaults
-    return DEFAULT_CONFIG
+    return _DEFAULT_CONFIG_FROZEN
+
+
+def load_settings():
+    """Load configuration as a :class:`Config` with attribute access.
+
+    Unknown keys are dropped; missing ones fall back to DEFAULT_CONFIG.
+    """
+    global _SETTINGS_CACHE
+
+    config = load_config()
+    cached = _SETTINGS_CACHE
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    values = {}
+    for key in Config._fields:
+        value = config.get(key, DEFAULT_CONFIG[key])
+        section = _SECTION_TYPES.get(key)
+        if section is not None:
+            if not isinstance(value, Mapping):
+                value = DEFAULT_CONFIG[key]
+            defaults = DEFAULT_CONFIG[key]
+            value = section(
+                *(value.get(name, defaults[name]) for name in section._fields)
+            )
+        values[key] = value
+
+    settings = Config(**values)
+    _SETTINGS_CACHE = (config, settings)
+    return settings
+
+
+def clear_config_cache():
+    """Forget cached config contents and missing-path entries."""
+    global _SETTINGS_CACHE
+
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE.clear()
+        _MISSING.clear()
+    _SETTINGS_CACHE = None
+
+
+# functools.lru_cache-style alias for callers that expect it
+load_config.cache_clear = clear_config_cache
+
+
+def _merge(defaults, overrides):
+    """Deep-merge ``overrides`` into a fresh copy of ``defaults``.
+
+    Nested dicts are copied one level at a time as the merge descends, so
+    ``defaults`` is never mutated and keys missing from a user section keep
+    their default values.
+    """
+    merged = dict(defaults)
+    stack = [(merged, overrides)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                dst[key] = dict(dst[key])
+                stack.append((dst[key], value))
+            else:
+                dst[key] = value
+    return merged
+
+
+def _thaw(config):
+    """Return a plain-dict copy of a (possibly read-only) config mapping."""
+    return {
+        key: _thaw(value) if isinstance(value, Mapping) else value
+        for key, value in config.items()
+    }
+
+
+def _diff(config, defaults):
+    """Return only the entries of ``config`` that differ from ``defaults``."""
+    out = {}
+    for key, value in config.items():
+        default = defaults.get(key)
+        if isinstance(value, Mapping) and isinstance(default, Mapping):
+            nested = _diff(value, default)
+            if nested:
+                out[key] = nested
+        elif isinstance(value, Mapping):
+            out[key] = _thaw(value)
+        elif key not in defaults or value != default:
+            out[key] = value
+    return out
+
+
+def _read_bytes(path, size):
+    """Read a whole file through a raw fd, sized from a prior stat."""
+    fd = os.open(os.fspath(path), os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        # One extra byte tells us whether the file grew since the stat
+        data = os.read(fd, size + 1)
+        if len(data) > size:
+            chunks = [data]
+            while chunk := os.read(fd, 65536):
+                chunks.append(chunk)
+            data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    return data
+
+
+def _sidecar_path(config_path):
+    """Return the JSON sidecar path for a config file."""
+    digest = hashlib.sha1(os.fsencode(config_path)).hexdigest()[:16]
+    return _SIDECAR_DIR / f"config-{digest}.json"
+
+
+def _read_user_config(config_path, st):
+    """Read the user YAML, going through a JSON sidecar when it is up to date.
+
+    The sidecar records the YAML's mtime and size and is only used on an
+    exact match, so a YAML replaced by an older file is still re-parsed.
+    """
+    json_path = _sidecar_path(config_path)
+    stamp = [st.st_mtime_ns, st.st_size]
+    try:
+        json_st = os.stat(json_path)
+        cached = _json_decode(_read_bytes(json_path, json_st.st_size))
+        if cached.get("stamp") == stamp:
+            return cached["config"]
+    except (OSError, KeyError, AttributeError, *_JSON_ERRORS):
+        pass
+
+    # Hand LibYAML raw bytes so no Python-level text decoding happens
+    user_config = yaml.load(_read_bytes(config_path, st.st_size), Loader=_LOADER)
+
+    # Refresh the sidecar; failing to write it only costs the fast path.
+    # JSON turns e.g. dates and non-string keys into strings, so a config
+    # that does not survive the round trip unchanged gets no sidecar.
+    tmp_path = json_path.with_name(json_path.name + ".tmp")
+    try:
+        payload = _json_encode({"stamp": stamp, "config": user_config})
+        if _json_decode(payload)["config"] != user_config:
+            return user_config
+        if _SIDECAR_DIR not in _ENSURED_DIRS:
+            _SIDECAR_DIR.mkdir(parents=True, exist_ok=True)
+            _ENSURED_DIRS.add(_SIDECAR_DIR)
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, json_path)
+    except (OSError, *_JSON_ERRORS):
+        pass
+
+    return user_config
 
 
 def save_config(config, path=None):
-    """Save configuration to file."""
+    """Save configuration to file.
+
+    Only values that differ from DEFAULT_CONFIG are written; load_config
+    merges the defaults back in.
+    """
     if path is None:
-        config_dir = Path.home() / ".config" / "activity-monitor"
-        config_dir.mkdir(parents=True, exist_ok=True)
-        path = config_dir / "config.yaml"
+        if _USER_CONFIG_DIR not in _ENSURED_DIRS:
+            _USER_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+            _ENSURED_DIRS.add(_USER_CONFIG_DIR)
+        path = _CONFIG_PATHS[0]
+
+    payload = yaml.dump(_diff(config, DEFAULT_CONFIG), Dumper=_ConfigDumper)
+    payload = payload.encode("utf-8")
+
+    # Write to a temp file and rename over the target so a crash mid-save
+    # never leaves a truncated config behind
+    tmp_path = f"{os.fspath(path)}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
 
-    with open(path, "w") as f:
-        yaml.dump(config, f, default_flow_style=False, indent=2)
+    clear_config_cache()
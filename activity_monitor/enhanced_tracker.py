@@ -11,69 +11,164 @@ Features:
 """
 
 import os
+import re
+import sched
 import time
 import subprocess
 import json
+import csv
+import gzip
 import sqlite3
+import importlib.util
 from datetime import datetime, timedelta
-from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-import yaml
 import argparse
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import plotly.express as px
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich import print as rprint
-from rich.layout import Layout
-from rich.live import Live
-import psutil
 import threading
-import signal
-import sys
+import atexit
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Optional PDF dependencies - reportlab takes ~0.1s to import, so it is only
+# loaded by _reportlab() when a PDF is generated; until then PDF_AVAILABLE
+# just says whether it is installed
+PDF_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+_REPORTLAB_LOADED = False
+
+
+def _reportlab():
+    """Import the reportlab names used for PDFs on first use.
+
+    Returns False (and clears PDF_AVAILABLE) when reportlab can't be imported.
+    """
+    global PDF_AVAILABLE, _REPORTLAB_LOADED
+    global colors, letter, SimpleDocTemplate, RLTable, TableStyle, Paragraph
+    global Spacer, getSampleStyleSheet, ParagraphStyle, HexColor
+    if _REPORTLAB_LOADED or not PDF_AVAILABLE:
+        return PDF_AVAILABLE
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import (
+            SimpleDocTemplate,
+            Table as RLTable,
+            TableStyle,
+            Paragraph,
+            Spacer,
+        )
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.colors import HexColor
+    except ImportError:
+        PDF_AVAILABLE = False  # PDF functionality will be disabled
+    _REPORTLAB_LOADED = True
+    return PDF_AVAILABLE
 
-# Optional PDF dependencies - import with error handling
-PDF_AVAILABLE = False
+
+# Optional libgit2 bindings - fall back to the git CLI when unavailable
+PYGIT2_AVAILABLE = False
 try:
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import (
-        SimpleDocTemplate,
-        Table as RLTable,
-        TableStyle,
-        Paragraph,
-        Spacer,
-        Image,
-        PageBreak,
-    )
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.graphics.shapes import Drawing
-    from reportlab.graphics.charts.barcharts import VerticalBarChart
-    from reportlab.graphics.charts.linecharts import HorizontalLineChart
-    from reportlab.graphics.charts.piecharts import Pie
-    from reportlab.lib.colors import HexColor
-
-    PDF_AVAILABLE = True
+    import pygit2
+
+    PYGIT2_AVAILABLE = True
 except ImportError:
-    pass  # PDF functionality will be disabled
+    pass  # git queries will spawn subprocesses instead
+
+# pandas is only needed for reports; import it on first use so the monitor
+# daemon and quick commands like --status start without it
+_pd = None
+
+
+def _pandas():
+    """Import pandas on first use and return the module."""
+    global _pd
+    if _pd is None:
+        import pandas
 
-from .config import load_config
+        _pd = pandas
+    return _pd
+
+
+def _format_timestamps(values, fmt):
+    """Format a column of ISO timestamp strings in one pass; '' where missing."""
+    pd = _pandas()
+    try:
+        parsed = pd.to_datetime(values, format="ISO8601")
+    except (TypeError, ValueError):  # pandas < 2.0 has no "ISO8601" format
+        parsed = pd.to_datetime(values)
+    return parsed.dt.strftime(fmt).fillna("")
+
+
+from .config import load_settings
 
 # Load config using the config module
-config = load_config()
+settings = load_settings()
 
-IDLE_THRESHOLD = config.get("idle_threshold", 300)
-SCAN_INTERVAL = config.get("scan_interval", 3)
-LOG_DIR = os.path.expanduser(config.get("log_dir", "~/Desktop/notes/time_log"))
-MONITOR_PATH = os.path.expanduser(config.get("monitor_path", "~/developement"))
+IDLE_THRESHOLD = settings.idle_threshold
+SCAN_INTERVAL = settings.scan_interval
+LOG_DIR = os.path.expanduser(settings.log_dir)
+MONITOR_PATH = os.path.expanduser(settings.monitor_path)
 DB_PATH = os.path.join(LOG_DIR, "activity_monitor_test.db")
 
+# "N files changed, N insertions(+), N deletions(-)" from git diff --shortstat;
+# either count is left out when it is zero
+SHORTSTAT_RE = re.compile(
+    r"(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?"
+)
+
+# Seconds between live status displays
+STATUS_INTERVAL = 60
+
+# File events for the same path closer together than this are coalesced;
+# touch records older than TOUCH_RETENTION seconds are pruned
+EVENT_DEBOUNCE = 0.5
+TOUCH_RETENTION = 60
+
+# Header of the task summary table at the top of each daily markdown file
+_TASK_TABLE_HEAD = (
+    "| Time | Task/Project | Repository | Duration | Files | Lines | Productivity | Status |\n"
+    "|------|-------------|------------|----------|-------|-------|--------------|--------|\n"
+)
+
+# Weekly/monthly summary tables: header with separator, then one row per line
+_DAILY_TABLE_HEAD = (
+    "| Date | Hours | Sessions | Repos | Productivity | Top Repository |\n"
+    "|------|-------|----------|-------|--------------|----------------|\n"
+)
+_DAILY_ROW_TMPL = (
+    "| {date} | {hours:.1f}h | {sessions} | {repos} | {prod:.1f} | {top} |\n"
+)
+_REPO_TABLE_HEAD = (
+    "| Repository | Hours | Sessions | Avg Productivity | Files | Lines Changed |\n"
+    "|------------|-------|----------|------------------|-------|---------------|\n"
+)
+_REPO_ROW_TMPL = (
+    "| {repo} | {hours:.1f}h | {sessions} | {prod:.1f} | {files} | {lines} |\n"
+)
+
+# How many directories below MONITOR_PATH to look for repositories. Hidden
+# directories and SKIP_DIRS are not searched, so repositories deeper than this
+# or inside one of those are not tracked
+REPO_SCAN_DEPTH = 4
+
+# Seconds between background rescans for new repositories; a directory
+# created directly in MONITOR_PATH triggers one REPO_RESCAN_SETTLE seconds
+# later instead, giving e.g. git clone time to create .git
+REPO_RESCAN_INTERVAL = 600
+REPO_RESCAN_SETTLE = 2
+
+# File events to ignore: by extension, or by any path component
+SKIP_EXTENSIONS = frozenset({".pyc", ".log", ".tmp", ".swp", ".DS_Store"})
+SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules", ".vscode"})
+# Searched in "/" + path: requiring a separator before the component instead
+# of allowing "^" too makes each search about three times faster
+SKIP_PATH_RE = re.compile(
+    r"[\\/](?:%s)(?:[\\/]|$)" % "|".join(map(re.escape, sorted(SKIP_DIRS)))
+)
+_SKIP_SUFFIXES = tuple(SKIP_EXTENSIONS)  # for str.endswith
+
 console = Console()
 VERBOSE = False  # Global verbose flag
 
@@ -109,14 +204,134 @@ def error_print(msg):
 class DatabaseManager:
     """Manages SQLite database operations for activity tracking."""
 
+    # Buffered sessions are written in one transaction once this many are
+    # pending, or once the oldest has waited FLUSH_INTERVAL seconds
+    FLUSH_ROWS = 20
+    FLUSH_INTERVAL = 30
+
+    # Process-wide manager handed out by instance()
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    # Database files whose schema has been set up during this process
+    _initialized_paths = set()
+
+    # Column order of the tuples passed to save_session()
+    INSERT_SESSION = """
+            INSERT INTO activity_sessions 
+            (repo_path, repo_name, start_time, end_time, duration_seconds, 
+             commit_hash, commit_message, files_changed, lines_added, lines_deleted, productivity_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+    SESSIONS_QUERY = """
+            SELECT * FROM activity_sessions 
+            WHERE created_at >= datetime('now', ?)
+            ORDER BY created_at DESC
+        """
+
+    # The newest sessions, each carrying the total number in the window
+    RECENT_SESSIONS_QUERY = """
+            SELECT 
+                strftime('%H:%M', created_at) as created_time,
+                repo_name,
+                duration_seconds,
+                commit_message,
+                productivity_score,
+                COUNT(*) OVER () as total_sessions
+            FROM activity_sessions 
+            WHERE created_at >= datetime('now', ?)
+            ORDER BY created_at DESC
+            LIMIT ?
+        """
+
+    # Whole days come from daily_stats; only the partial day at the start of
+    # the window is aggregated from activity_sessions
+    DAILY_STATS_QUERY = """
+            SELECT 
+                date,
+                total_time_seconds as total_time,
+                repos_worked_on as repos_count,
+                commits_made as sessions_count,
+                files_changed,
+                lines_changed,
+                avg_session_duration,
+                productivity_score as avg_productivity
+            FROM daily_stats
+            WHERE date > DATE('now', :window)
+            UNION ALL
+            SELECT 
+                DATE(created_at) as date,
+                SUM(duration_seconds) as total_time,
+                COUNT(DISTINCT repo_path) as repos_count,
+                COUNT(*) as sessions_count,
+                SUM(files_changed) as files_changed,
+                SUM(lines_added + lines_deleted) as lines_changed,
+                AVG(duration_seconds) as avg_session_duration,
+                AVG(productivity_score) as avg_productivity
+            FROM activity_sessions 
+            WHERE created_at >= datetime('now', :window)
+                AND created_at < DATE('now', :window, '+1 day')
+            GROUP BY DATE(created_at)
+            ORDER BY date DESC
+        """
+
+    # Rebuilds the daily_stats rows for the days matched by {where}
+    _DAILY_STATS_REFRESH = """
+            INSERT INTO daily_stats 
+            SELECT 
+                DATE(created_at),
+                SUM(duration_seconds),
+                COUNT(DISTINCT repo_path),
+                COUNT(*),
+                SUM(files_changed),
+                SUM(lines_added + lines_deleted),
+                AVG(duration_seconds),
+                AVG(productivity_score)
+            FROM activity_sessions
+            {where}
+            GROUP BY DATE(created_at);
+        """
+
     def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_since = None
+        self.conn = None
         self.init_database()
+        atexit.register(self.flush)
+
+    @classmethod
+    def instance(cls):
+        """Return the shared manager, creating it on first use.
+
+        Sharing one manager means one connection, one schema check and one
+        write buffer for the tracker, analytics and CLI commands.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _connect(self):
+        """Open the long-lived write connection with tuned PRAGMAs."""
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        return conn
 
     def init_database(self):
         """Initialize SQLite database."""
         os.makedirs(LOG_DIR, exist_ok=True)
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        if self.conn is None:
+            self.conn = self._connect()
+        if DB_PATH in DatabaseManager._initialized_paths:
+            return
+        cursor = self.conn.cursor()
 
         # Main activity sessions table
         cursor.execute(
@@ -170,176 +385,502 @@ class DatabaseManager:
         """
         )
 
-        conn.commit()
-        conn.close()
-
-    def save_session(self, session_data):
-        """Save a completed session to database."""
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
+        # Indexes for the date-window filters and per-repo lookups
         cursor.execute(
             """
-            INSERT INTO activity_sessions 
-            (repo_path, repo_name, start_time, end_time, duration_seconds, 
-             commit_hash, commit_message, files_changed, lines_added, lines_deleted, productivity_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            session_data,
+            CREATE INDEX IF NOT EXISTS idx_sessions_created_repo
+            ON activity_sessions (created_at, repo_path)
+        """
         )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_sessions_repo_created
+            ON activity_sessions (repo_name, created_at)
+        """
+        )
+
+        # Keep daily_stats in step with activity_sessions for every writer;
+        # each change re-aggregates just the affected day through the index
+        has_triggers = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'trg_daily_stats_insert'"
+        ).fetchone()
+        for event, days in (
+            ("INSERT", ("NEW",)),
+            ("DELETE", ("OLD",)),
+            ("UPDATE", ("OLD", "NEW")),
+        ):
+            body = "".join(
+                f"DELETE FROM daily_stats WHERE date = DATE({row}.created_at);"
+                + self._DAILY_STATS_REFRESH.format(
+                    where=f"WHERE created_at >= DATE({row}.created_at) "
+                    f"AND created_at < DATE({row}.created_at, '+1 day')"
+                )
+                for row in days
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_daily_stats_{event.lower()} "
+                f"AFTER {event} ON activity_sessions BEGIN {body} END"
+            )
+        if not has_triggers:
+            # Backfill the days recorded before the triggers existed
+            cursor.execute("BEGIN")
+            cursor.execute("DELETE FROM daily_stats")
+            cursor.execute(self._DAILY_STATS_REFRESH.format(where=""))
+            cursor.execute("COMMIT")
+
+        # The planner only prefers the composite indexes once statistics exist
+        has_stats = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).fetchone()
+        cursor.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+        DatabaseManager._initialized_paths.add(DB_PATH)
+
+    def save_session(self, session_data):
+        """Queue a completed session; rows are written in batches."""
+        with self._lock:
+            self._pending.append(session_data)
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            if len(self._pending) >= self.FLUSH_ROWS:
+                self._flush_locked()
+
+    def flush(self):
+        """Write all queued sessions in a single transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def flush_if_due(self):
+        """Flush queued sessions once the oldest has waited long enough."""
+        with self._lock:
+            if (
+                self._pending_since is not None
+                and time.monotonic() - self._pending_since >= self.FLUSH_INTERVAL
+            ):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        """Write the queued sessions, retrying row by row if the batch fails.
+
+        Rows the database rejects (a constraint violation, a bad value) are
+        logged and dropped; on an operational error such as "database is
+        locked" the remaining rows stay queued for the next flush. Either
+        way the queue keeps moving and the read paths that flush still work.
+        """
+        if not self._pending:
+            return
+        rows = self._pending
+        self._pending = []
+        self._pending_since = None
 
-        conn.commit()
-        conn.close()
+        try:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(self.INSERT_SESSION, rows)
+            self.conn.execute("COMMIT")
+        except BaseException as e:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            if not isinstance(e, (sqlite3.Error, OverflowError)):
+                self._requeue_locked(rows)
+                raise
+            verbose_print(f"Batch insert failed ({e}); retrying row by row")
+        else:
+            verbose_print(f"Flushed {len(rows)} session(s) to database")
+            return
+
+        for i, row in enumerate(rows):
+            try:
+                self.conn.execute(self.INSERT_SESSION, row)
+            except sqlite3.OperationalError as e:
+                error_print(
+                    f"Failed to write sessions to database, "
+                    f"{len(rows) - i} kept queued: {e}"
+                )
+                self._requeue_locked(rows[i:])
+                return
+            except (sqlite3.Error, OverflowError) as e:
+                error_print(f"Dropped session for {row[1]}: {e}")
+
+    def _requeue_locked(self, rows):
+        """Put unwritten rows back at the front of the queue."""
+        self._pending[:0] = rows
+        self._pending_since = time.monotonic()
+
+    def _read_sql(self, query, params=None):
+        """Run a query on the shared connection and return a DataFrame.
+
+        Queued sessions are flushed first so reads see them.
+        """
+        pd = _pandas()
+        with self._lock:
+            self._flush_locked()
+            return pd.read_sql_query(query, self.conn, params=params)
 
     def get_sessions(self, days=7):
         """Get recent sessions."""
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(
-            """
-            SELECT * FROM activity_sessions 
-            WHERE created_at >= datetime('now', '-{} days')
-            ORDER BY created_at DESC
-        """.format(
-                days
-            ),
-            conn,
-        )
-        conn.close()
-        return df
+        return self._read_sql(self.SESSIONS_QUERY, (f"-{int(days)} days",))
 
-    def get_daily_stats(self, days=30):
-        """Get daily statistics."""
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(
+    def get_recent_sessions_rows(self, days=1, limit=10):
+        """Get the newest ``limit`` sessions as sqlite3.Row objects.
+
+        Each row's ``total_sessions`` is the number of sessions in the whole
+        window, so callers can report it without loading every row.
+        """
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(
+                self.RECENT_SESSIONS_QUERY, (f"-{int(days)} days", int(limit))
+            ).fetchall()
+
+    def write_sessions_csv(self, f, days=7):
+        """Stream recent sessions to a text file as CSV, without pandas.
+
+        Rows go from the cursor to the csv writer in batches, so memory stays
+        flat however long the history is. Returns the number of rows written.
+        """
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.execute(self.SESSIONS_QUERY, (f"-{int(days)} days",))
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow([column[0] for column in cursor.description])
+            count = 0
+            while rows := cursor.fetchmany(1000):
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+
+    def get_repo_daily_stats(self, days=30):
+        """Get per-day, per-repository session aggregates."""
+        return self._read_sql(
             """
             SELECT 
                 DATE(created_at) as date,
-                SUM(duration_seconds) as total_time,
-                COUNT(DISTINCT repo_path) as repos_count,
+                repo_name,
+                SUM(duration_seconds) as duration_seconds,
                 COUNT(*) as sessions_count,
                 SUM(files_changed) as files_changed,
-                SUM(lines_added + lines_deleted) as lines_changed,
-                AVG(duration_seconds) as avg_session_duration,
-                AVG(productivity_score) as avg_productivity
+                SUM(lines_added) as lines_added,
+                SUM(lines_deleted) as lines_deleted,
+                SUM(productivity_score) as productivity_total
             FROM activity_sessions 
-            WHERE created_at >= datetime('now', '-{} days')
-            GROUP BY DATE(created_at)
-            ORDER BY date DESC
-        """.format(
-                days
-            ),
-            conn,
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY DATE(created_at), repo_name
+            ORDER BY date DESC, repo_name
+        """,
+            (f"-{int(days)} days",),
         )
-        conn.close()
-        return df
+
+    def get_daily_stats(self, days=30):
+        """Get daily statistics."""
+        return self._read_sql(self.DAILY_STATS_QUERY, {"window": f"-{int(days)} days"})
+
+    def get_daily_stats_rows(self, days=30):
+        """Get daily statistics as sqlite3.Row objects, without pandas."""
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(
+                self.DAILY_STATS_QUERY, {"window": f"-{int(days)} days"}
+            ).fetchall()
+
+
+@dataclass(slots=True)
+class RepoState:
+    """Per-repository tracking state."""
+
+    start: float | None = None  # time.monotonic() the active session began
+    last: float | None = None  # time.monotonic() of its last file change
+    accumulated: float = 0.0  # paused session time not yet committed
+    last_commit: str | None = None
+    files: set = field(default_factory=set)  # changed file paths
+    name: str = ""  # repository directory name, for display
 
 
 class EnhancedActivityTracker:
     """Enhanced activity tracker with advanced features."""
 
     def __init__(self):
-        self.db = DatabaseManager()
-        self.active_sessions = {}
-        self.accumulated_time = {}
-        self.last_commits = {}
-        self.file_changes = {}  # Will store sets of changed file paths
+        self.db = DatabaseManager.instance()
+        self.repos = {}  # {repo_path: RepoState}
         self.running = False
+        self._stop_event = threading.Event()  # wakes run() on stop
         self.observer = None
+        self._handler = None
+        self._watched_repos = {}  # {repo_path: ObservedWatch}
+        self._rescan_event = threading.Event()  # requests an early rescan
+        self._rescan_thread = None
+        self._known_repos = set()  # repositories the last scan found
+        self._repo_cache = {}  # {repo_path: pygit2.Repository}
+        self._commit_messages = {}  # {repo_path: (commit_hash, message)}
+        self._git_procs = {}  # {repo_path: `git cat-file --batch` Popen}
+        self._head_cache = {}  # {repo_path: (HEAD key, HEAD, ref key, hash)}
+        self._markdown_sections = {}  # {date: "## " headings in the daily file}
+        self.recent_touches = {}  # {file_path: monotonic time of last event}
+
+    def _open_repo(self, repo_path):
+        """Return a cached pygit2 Repository, or None without pygit2."""
+        if not PYGIT2_AVAILABLE:
+            return None
+        repo = self._repo_cache.get(repo_path)
+        if repo is None:
+            try:
+                repo = pygit2.Repository(repo_path)
+            except pygit2.GitError as e:
+                verbose_print(f"Failed to open repository {repo_path}: {e}")
+                return None
+            self._repo_cache[repo_path] = repo
+        return repo
+
+    def _cat_file(self, repo_path, name):
+        """Look up an object through a long-lived ``git cat-file --batch``.
+
+        Each repository gets one helper process that answers queries on its
+        stdin, so lookups don't fork a new git each time. Returns
+        (object id, type, raw contents), or None if ``name`` does not exist.
+        Raises OSError if the helper cannot be used.
+        """
+        proc = self._git_procs.get(repo_path)
+        if proc is None or proc.poll() is not None:
+            proc = subprocess.Popen(
+                ["git", "-C", repo_path, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._git_procs[repo_path] = proc
+
+        try:
+            proc.stdin.write(name.encode() + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline()
+            if not header:
+                raise OSError(f"git cat-file exited for {repo_path}")
+            fields = header.split()
+            if len(fields) != 3:
+                return None  # "<name> missing"
+            oid, kind, size = fields
+            # Contents are followed by a single newline
+            data = proc.stdout.read(int(size) + 1)[:-1]
+        except (OSError, ValueError):
+            self._close_git_proc(repo_path)
+            raise OSError(f"git cat-file failed for {repo_path}")
+        return oid.decode(), kind.decode(), data
+
+    def _close_git_proc(self, repo_path):
+        """Shut down a repository's cat-file helper, if one is running."""
+        proc = self._git_procs.pop(repo_path, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def _read_head(self, repo_path):
+        """Resolve HEAD by reading the repository's ref files directly.
+
+        Returns (True, commit hash or None for an unborn branch), or
+        (False, None) when the layout is not a plain ``.git`` directory with
+        files-backed refs and git has to be asked instead. The files are only
+        re-read when their stat information changes, so an idle repository
+        costs three stat calls per check.
+        """
+        git_dir = os.path.join(repo_path, ".git")
+        packed_path = os.path.join(git_dir, "packed-refs")
+        try:
+            head_key = _stat_key(os.path.join(git_dir, "HEAD"))
+            if head_key is None:
+                return False, None
+
+            cached = self._head_cache.get(repo_path)
+            if cached is not None and cached[0] == head_key:
+                head = cached[1]
+            else:
+                # Only a HEAD that changed needs the reftable check again
+                cached = None
+                if os.path.isdir(os.path.join(git_dir, "reftable")):
+                    self._head_cache.pop(repo_path, None)
+                    return False, None
+                with open(os.path.join(git_dir, "HEAD")) as f:
+                    head = f.read().strip()
+
+            if not head.startswith("ref: "):
+                # Detached HEAD holds the commit hash itself
+                if not _is_object_id(head):
+                    return False, None
+                self._head_cache[repo_path] = (head_key, head, None, head)
+                return True, head
+
+            ref_name = head[5:]
+            ref_key = (
+                _stat_key(os.path.join(git_dir, ref_name)),
+                _stat_key(packed_path),
+            )
+            if cached is not None and cached[2] == ref_key:
+                return True, cached[3]
+
+            commit_hash = None
+            if ref_key[0] is not None:
+                with open(os.path.join(git_dir, ref_name)) as f:
+                    commit_hash = f.read().strip()
+            elif ref_key[1] is not None:
+                with open(packed_path) as f:
+                    for line in f:
+                        object_id, _, name = line.rstrip("\n").partition(" ")
+                        if name == ref_name:
+                            commit_hash = object_id
+                            break
+            if commit_hash is not None and not _is_object_id(commit_hash):
+                return False, None  # e.g. a symbolic ref pointing at a ref
+        except OSError as e:
+            verbose_print(f"Failed to read HEAD of {repo_path}: {e}")
+            return False, None
+
+        self._head_cache[repo_path] = (head_key, head, ref_key, commit_hash)
+        return True, commit_hash
+
+    def _get_head(self, repo_path):
+        """Return the HEAD commit hash of a repository, or None."""
+        handled, commit_hash = self._read_head(repo_path)
+        if handled:
+            return commit_hash
+
+        repo = self._open_repo(repo_path)
+        if repo is not None:
+            try:
+                return str(repo.head.target)
+            except (pygit2.GitError, KeyError) as e:
+                verbose_print(f"Failed to get commit hash for {repo_path}: {e}")
+                return None
+
+        try:
+            head = self._cat_file(repo_path, "HEAD")
+        except OSError as e:
+            verbose_print(f"{e}; falling back to git rev-parse")
+        else:
+            if head is None:
+                verbose_print(f"Failed to get commit hash for {repo_path}: no HEAD")
+                return None
+            return head[0]
+
+        output = _git(repo_path, "rev-parse", "HEAD")
+        return output.strip() if output is not None else None
 
     def calculate_productivity_score(self, duration, files_changed, lines_changed):
         """Calculate a productivity score based on various metrics."""
         if duration == 0:
             return 0.0
 
-        # Base score from time spent
-        base_score = min(duration / 3600, 1.0) * 40  # Max 40 points for time
+        # Base score from time spent - max 40 points, reached at one hour
+        base_score = 40.0 if duration >= 3600 else duration / 3600 * 40
 
-        # File activity score
-        file_score = min(files_changed * 5, 30)  # Max 30 points for files
+        # File activity score - max 30 points, reached at 6 files
+        file_score = 30 if files_changed >= 6 else files_changed * 5
 
-        # Lines changed score
-        lines_score = min(lines_changed / 10, 30)  # Max 30 points for lines
+        # Lines changed score - max 30 points, reached at 300 lines
+        lines_score = 30 if lines_changed >= 300 else lines_changed / 10
 
         return base_score + file_score + lines_score
 
     def get_git_stats(self, repo_path):
         """Get detailed git statistics from both staged and unstaged changes."""
-        try:
-            lines_added = lines_deleted = 0
-            files_changed = 0
-
-            # Get stats from both unstaged and staged changes
-            for cmd_name, cmd in [
-                ("unstaged", ["git", "-C", repo_path, "diff", "--stat"]),
-                ("staged", ["git", "-C", repo_path, "diff", "--cached", "--stat"]),
-            ]:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-
-                if result.returncode == 0 and result.stdout.strip():
-                    lines = result.stdout.strip().split("\n")
-                    verbose_print(f"Git {cmd_name} diff output:")
-                    for line in lines:
-                        verbose_print(f"  {line}")
-
-                    # Parse the summary line (last line if multiple files)
-                    summary_found = False
-                    for line in lines:
-                        if "file changed" in line or "files changed" in line:
-                            # Format: "X file(s) changed, Y insertion(s)(+), Z deletion(s)(-)"
-                            parts = line.split(",")
-                            verbose_print(f"Parsing summary line: {line}")
-                            summary_found = True
-
-                            # Extract files changed
-                            if "file" in parts[0]:
-                                try:
-                                    file_count = int(parts[0].split()[0])
-                                    files_changed += file_count
-                                    verbose_print(f"Found {file_count} files changed")
-                                except (ValueError, IndexError) as e:
-                                    verbose_print(f"Error parsing file count: {e}")
-
-                            # Extract insertions
-                            for part in parts:
-                                if "insertion" in part:
-                                    try:
-                                        added = int(part.strip().split()[0])
-                                        lines_added += added
-                                        verbose_print(f"Found {added} lines added")
-                                    except (ValueError, IndexError) as e:
-                                        verbose_print(f"Error parsing insertions: {e}")
-                                elif "deletion" in part:
-                                    try:
-                                        deleted = int(part.strip().split()[0])
-                                        lines_deleted += deleted
-                                        verbose_print(f"Found {deleted} lines deleted")
-                                    except (ValueError, IndexError) as e:
-                                        verbose_print(f"Error parsing deletions: {e}")
-
-                    # Only count individual files if no summary was found
-                    if not summary_found:
-                        for line in lines:
-                            if " | " in line and (
-                                "++" in line or "--" in line or "+-" in line
-                            ):
-                                # Individual file line format: "filename | 5 +++--"
-                                files_changed += 1
-                                verbose_print(f"Found individual file change: {line}")
+        repo = self._open_repo(repo_path)
+        if repo is not None:
+            try:
+                lines_added = lines_deleted = files_changed = 0
+                for diff in (repo.diff(), repo.diff("HEAD", cached=True)):
+                    stats = diff.stats
+                    lines_added += stats.insertions
+                    lines_deleted += stats.deletions
+                    files_changed += stats.files_changed
+                verbose_print(
+                    f"Final git stats: {lines_added} added, {lines_deleted} deleted, {files_changed} files"
+                )
+                return lines_added, lines_deleted, files_changed
+            except (pygit2.GitError, KeyError) as e:
+                # e.g. no commits yet - let the git CLI handle it
+                verbose_print(f"pygit2 diff failed, falling back to git: {e}")
+
+        lines_added = lines_deleted = 0
+        files_changed = 0
+
+        # Get stats from both unstaged and staged changes
+        for cmd_name, args in [
+            ("unstaged", ("diff", "--shortstat")),
+            ("staged", ("diff", "--cached", "--shortstat")),
+        ]:
+            output = _git(repo_path, *args)
+            if output is None:
+                continue
 
-            verbose_print(
-                f"Final git stats: {lines_added} added, {lines_deleted} deleted, {files_changed} files"
-            )
-            return lines_added, lines_deleted, files_changed
-        except Exception as e:
-            verbose_print(f"Error getting git stats: {e}")
+            # A single summary line, empty when there are no changes
+            verbose_print(f"Git {cmd_name} shortstat: {output.strip()}")
+            match = SHORTSTAT_RE.search(output)
+            if match:
+                files, added, deleted = match.groups()
+                files_changed += int(files)
+                lines_added += int(added or 0)
+                lines_deleted += int(deleted or 0)
+
+        verbose_print(
+            f"Final git stats: {lines_added} added, {lines_deleted} deleted, {files_changed} files"
+        )
+        return lines_added, lines_deleted, files_changed
+
+    def get_commit_stats(self, repo_path, commit_hash):
+        """Get (lines added, lines deleted, files changed) of one commit.
+
+        Merges are compared with their first parent, and a root commit with
+        the empty tree, as ``git show --shortstat`` does.
+        """
+        repo = self._open_repo(repo_path)
+        if repo is not None:
+            try:
+                commit = repo[commit_hash]
+                if commit.parents:
+                    diff = repo.diff(commit.parents[0], commit)
+                else:
+                    diff = commit.tree.diff_to_tree(swap=True)
+                stats = diff.stats
+                return stats.insertions, stats.deletions, stats.files_changed
+            except (pygit2.GitError, KeyError, ValueError) as e:
+                verbose_print(f"pygit2 commit diff failed, falling back to git: {e}")
+
+        output = _git(repo_path, "show", "--shortstat", "--format=", commit_hash)
+        match = SHORTSTAT_RE.search(output) if output is not None else None
+        if match is None:
             return 0, 0, 0
+        files, added, deleted = match.groups()
+        return int(added or 0), int(deleted or 0), int(files)
+
+    def _get_unstaged_files(self, repo_path):
+        """Return the paths ``git diff --name-only`` would list, or []."""
+        repo = self._open_repo(repo_path)
+        if repo is not None:
+            try:
+                return [delta.new_file.path for delta in repo.diff().deltas]
+            except pygit2.GitError as e:
+                verbose_print(f"pygit2 diff failed, falling back to git: {e}")
+
+        output = _git(repo_path, "diff", "--name-only")
+        if output is None:
+            return []
+        return [name for name in output.split("\n") if name]
 
     def start_monitoring(self):
         """Start the file system monitoring."""
         self.running = True
-        handler = EnhancedChangeHandler(self)
+        self._stop_event.clear()
+        self._handler = EnhancedChangeHandler(self)
         self.observer = Observer()
-        self.observer.schedule(handler, MONITOR_PATH, recursive=True)
         self.observer.start()
 
         info_print(f"🚀 Activity Monitor Started")
@@ -354,6 +895,8 @@ class EnhancedActivityTracker:
                 f"📁 Monitoring: {MONITOR_PATH}\n"
                 f"💾 Database: {DB_PATH}\n"
                 f"⏱️  Idle threshold: {IDLE_THRESHOLD}s\n"
+                f"🔎 Repository search: {REPO_SCAN_DEPTH} levels deep, "
+                f"hidden directories skipped\n"
                 f"🔍 Verbose mode: {'ON' if VERBOSE else 'OFF'}",
                 border_style="green",
             )
@@ -364,14 +907,34 @@ class EnhancedActivityTracker:
             error_print(f"Monitoring path does not exist: {MONITOR_PATH}")
             return None
 
-        # Look for git repositories in the monitoring path
+        # Look for git repositories in the monitoring path and watch only
+        # those, rather than every file under MONITOR_PATH
         git_repos = []
         try:
-            for root, dirs, files in os.walk(MONITOR_PATH):
-                if ".git" in dirs:
-                    git_repos.append(root)
+            git_repos = find_git_repos(MONITOR_PATH)
         except Exception as e:
             error_print(f"Error scanning for git repos: {e}")
+        for repo in git_repos:
+            self._watch_repo(repo)
+        self._known_repos = set(git_repos)
+
+        # New repositories are picked up off the scheduler thread: a
+        # non-recursive watch on the monitoring path notices new top-level
+        # directories, and a background rescan catches everything else
+        try:
+            self.observer.schedule(
+                _MonitorRootHandler(self), MONITOR_PATH, recursive=False
+            )
+        except OSError as e:
+            error_print(f"Failed to watch {MONITOR_PATH}: {e}")
+        self._rescan_event.clear()
+        self._rescan_thread = threading.Thread(
+            target=self._rescan_loop, name="repo-rescan", daemon=True
+        )
+        self._rescan_thread.start()
+
+        # Render summary rows queued by an earlier version
+        self.render_markdown_tables()
 
         if git_repos:
             info_print(f"Found {len(git_repos)} Git repositories:")
@@ -387,142 +950,214 @@ class EnhancedActivityTracker:
                 "Make sure you have Git repositories in the monitored directory"
             )
 
-        # Start the monitoring loop in a separate thread
-        monitor_thread = threading.Thread(target=self._monitor_loop)
-        monitor_thread.daemon = True
-        monitor_thread.start()
-
         return self.observer
 
-    def _monitor_loop(self):
-        """Main monitoring loop."""
-        status_counter = 0
+    def _watch_repo(self, repo_path):
+        """Schedule a recursive watch on a repository root (once)."""
+        if repo_path in self._watched_repos:
+            return False
+        try:
+            self._watched_repos[repo_path] = self.observer.schedule(
+                self._handler, repo_path, recursive=True
+            )
+        except OSError as e:
+            error_print(f"Failed to watch {repo_path}: {e}")
+            return False
+        return True
+
+    def _watch_new_repos(self):
+        """Rescan the monitoring path and watch repositories created since."""
+        try:
+            git_repos = find_git_repos(MONITOR_PATH)
+        except OSError as e:
+            verbose_print(f"Error rescanning for git repos: {e}")
+            return
+        # Repositories created, moved or removed: cached roots may be stale
+        found = set(git_repos)
+        if found != self._known_repos:
+            _REPO_ROOTS.clear()
+            self._known_repos = found
+        for repo in git_repos:
+            if self._stop_event.is_set():
+                return
+            if self._watch_repo(repo):
+                info_print(f"📁 Watching new repository: {os.path.basename(repo)}")
+
+    def _rescan_loop(self):
+        """Rescan for new repositories on a background thread.
+
+        Runs every REPO_RESCAN_INTERVAL seconds, or REPO_RESCAN_SETTLE
+        seconds after _MonitorRootHandler asks, until monitoring stops.
+        """
+        while not self._stop_event.is_set():
+            if self._rescan_event.wait(REPO_RESCAN_INTERVAL):
+                self._stop_event.wait(REPO_RESCAN_SETTLE)
+            self._rescan_event.clear()
+            if self._stop_event.is_set():
+                return
+            self._watch_new_repos()
+
+    def run(self):
+        """Run the periodic checks on the calling thread until stopped.
+
+        File events arrive on the observer's own thread; this drives idle
+        detection, commit checks and the live status display. Between jobs
+        it blocks on the stop event, so stop_monitoring() ends it at once.
+        """
+        scheduler = sched.scheduler(time.monotonic, self._stop_event.wait)
 
+        def every(interval, priority, action):
+            def tick():
+                if not self.running:
+                    return
+                # One failed check must not end monitoring
+                try:
+                    action()
+                except Exception as e:
+                    error_print(f"Error in {action.__name__}: {e}")
+                scheduler.enter(interval, priority, tick)
+
+            scheduler.enter(interval, priority, tick)
+
+        every(SCAN_INTERVAL, 0, self._scan)
+        every(STATUS_INTERVAL, 1, self._show_live_status)
+        while not self._stop_event.is_set():
+            delay = scheduler.run(blocking=False)
+            if delay is None:
+                break
+            self._stop_event.wait(delay)
+
+    def _scan(self):
+        """Check sessions and commits, then write out any due sessions."""
+        # One snapshot for both checks: the watchdog thread may add
+        # repositories while they run
+        repos = list(self.repos.items())
+        self._check_idle_sessions(repos)
+        self._check_commits(repos)
+        self._prune_recent_touches()
         try:
-            while self.running:
-                time.sleep(SCAN_INTERVAL)
-                self._check_idle_sessions()
-                self._check_commits()
-
-                status_counter += 1
-                if status_counter >= 20:  # Every ~1 minute
-                    self._show_live_status()
-                    status_counter = 0
-
-        except KeyboardInterrupt:
-            self.stop_monitoring()
-
-    def _check_idle_sessions(self):
-        """Check for idle sessions and accumulate time."""
-        now = time.time()
+            self.db.flush_if_due()
+        except sqlite3.Error as e:
+            error_print(f"Failed to write sessions to database: {e}")
+
+    def _prune_recent_touches(self):
+        """Drop debounce records that can no longer suppress an event."""
+        cutoff = time.monotonic() - TOUCH_RETENTION
+        for path, touched in list(self.recent_touches.items()):
+            if touched < cutoff:
+                self.recent_touches.pop(path, None)
+
+    def _check_idle_sessions(self, repos=None):
+        """Check for idle sessions and accumulate time.
+
+        ``repos`` is a snapshot of ``self.repos.items()``, taken here if omitted.
+        """
+        if repos is None:
+            repos = list(self.repos.items())
+        now = time.monotonic()
         verbose_print(f"Checking for idle sessions (threshold: {IDLE_THRESHOLD}s)")
 
         idle_count = 0
-        for repo_path, (start, last) in list(self.active_sessions.items()):
-            if start and (now - last > IDLE_THRESHOLD):
-                duration = last - start
-                self.accumulated_time[repo_path] = (
-                    self.accumulated_time.get(repo_path, 0) + duration
-                )
-                self.active_sessions[repo_path] = (None, None)
+        for _, state in repos:
+            if state.start and (now - state.last > IDLE_THRESHOLD):
+                duration = state.last - state.start
+                state.accumulated += duration
+                state.start = state.last = None
 
-                repo_name = os.path.basename(repo_path)
-                info_print(f"⏸️  Session paused: {repo_name} ({duration/60:.1f}min)")
+                info_print(f"⏸️  Session paused: {state.name} ({duration/60:.1f}min)")
                 verbose_print(
-                    f"Moved to accumulated time: {self.accumulated_time[repo_path]/60:.1f}min total"
+                    f"Moved to accumulated time: {state.accumulated/60:.1f}min total"
                 )
                 idle_count += 1
 
-        if idle_count == 0 and len(self.active_sessions) > 0:
+        if idle_count == 0 and repos:
             verbose_print("No idle sessions found")
 
-    def _check_commits(self):
-        """Check for new commits and save completed sessions."""
-        all_repos = set(self.active_sessions.keys()) | set(self.accumulated_time.keys())
-        verbose_print(f"Checking commits in {len(all_repos)} repositories")
+    def _check_commits(self, repos=None):
+        """Check for new commits and save completed sessions.
 
-        for repo_path in all_repos:
-            try:
-                commit_hash = (
-                    subprocess.check_output(
-                        ["git", "-C", repo_path, "rev-parse", "HEAD"]
-                    )
-                    .decode()
-                    .strip()
-                )
-                verbose_print(
-                    f"Current commit in {os.path.basename(repo_path)}: {commit_hash[:7]}"
-                )
-            except subprocess.CalledProcessError as e:
-                verbose_print(f"Failed to get commit hash for {repo_path}: {e}")
+        ``repos`` is a snapshot of ``self.repos.items()``, taken here if omitted.
+        """
+        if repos is None:
+            repos = list(self.repos.items())
+        verbose_print(f"Checking commits in {len(repos)} repositories")
+
+        for repo_path, state in repos:
+            commit_hash = self._get_head(repo_path)
+            if commit_hash is None:
                 continue
+            if VERBOSE:
+                verbose_print(f"Current commit in {state.name}: {commit_hash[:7]}")
 
-            if repo_path not in self.last_commits:
-                self.last_commits[repo_path] = commit_hash
-                debug_print(
-                    f"Initialized commit tracking for {os.path.basename(repo_path)}"
-                )
+            if state.last_commit is None:
+                state.last_commit = commit_hash
+                debug_print(f"Initialized commit tracking for {state.name}")
                 continue
 
-            if commit_hash != self.last_commits[repo_path]:
-                info_print(f"🔄 New commit detected in {os.path.basename(repo_path)}")
-                verbose_print(f"Old commit: {self.last_commits[repo_path][:7]}")
+            if commit_hash != state.last_commit:
+                info_print(f"🔄 New commit detected in {state.name}")
+                verbose_print(f"Old commit: {state.last_commit[:7]}")
                 verbose_print(f"New commit: {commit_hash[:7]}")
                 self._handle_new_commit(repo_path, commit_hash)
-            else:
-                verbose_print(f"No new commits in {os.path.basename(repo_path)}")
+            elif VERBOSE:
+                verbose_print(f"No new commits in {state.name}")
 
     def _handle_new_commit(self, repo_path, commit_hash):
         """Handle a new commit by saving the session."""
-        repo_name = os.path.basename(repo_path)
+        state = self.repos.get(repo_path)
+        if state is None:
+            state = self.repos[repo_path] = RepoState(name=os.path.basename(repo_path))
+        repo_name = state.name
         verbose_print(f"Processing new commit in {repo_name}")
 
         # Add current active session to accumulated time
-        start, last = self.active_sessions.get(repo_path, (None, None))
-        if start:
-            session_duration = last - start
-            self.accumulated_time[repo_path] = (
-                self.accumulated_time.get(repo_path, 0) + session_duration
-            )
-            self.active_sessions[repo_path] = (None, None)
+        if state.start:
+            session_duration = state.last - state.start
+            state.accumulated += session_duration
+            state.start = state.last = None
             debug_print(
                 f"Added active session to accumulated: {session_duration/60:.1f}min"
             )
 
-        total_duration = self.accumulated_time.get(repo_path, 0)
+        total_duration = state.accumulated
         verbose_print(
             f"Total accumulated time for {repo_name}: {total_duration/60:.1f}min"
         )
 
         if total_duration > 0:
             # Get commit info and git stats
-            commit_message = self._get_commit_message(repo_path)
-            lines_added, lines_deleted, git_files_changed = self.get_git_stats(
-                repo_path
-            )
+            commit_message = self._get_commit_message(repo_path, commit_hash)
+            # The working tree is usually clean by now, so take the stats
+            # from the commit itself rather than from git diff
+            git_stats = self.get_commit_stats(repo_path, commit_hash)
+            lines_added, lines_deleted, git_files_changed = git_stats
 
             # Use the larger of file change counter or git stats for files changed
-            files_changed = max(
-                len(self.file_changes.get(repo_path, set())), git_files_changed
-            )
+            files_changed = max(len(state.files), git_files_changed)
 
-            verbose_print(f"Commit details:")
-            verbose_print(f"  - Hash: {commit_hash[:7]}")
-            verbose_print(f"  - Message: {commit_message[:50]}...")
-            verbose_print(f"  - Files changed: {files_changed}")
-            verbose_print(f"  - Lines added: {lines_added}, deleted: {lines_deleted}")
+            if VERBOSE:
+                verbose_print("Commit details:")
+                verbose_print(f"  - Hash: {commit_hash[:7]}")
+                verbose_print(f"  - Message: {commit_message[:50]}...")
+                verbose_print(f"  - Files changed: {files_changed}")
+                verbose_print(
+                    f"  - Lines added: {lines_added}, deleted: {lines_deleted}"
+                )
 
             # Calculate productivity score
             productivity_score = self.calculate_productivity_score(
                 total_duration, files_changed, lines_added + lines_deleted
             )
 
-            # Save to database
+            # Save to database; the timestamps are pre-formatted the way
+            # sqlite3's (deprecated) default datetime adapter writes them
+            end_time = datetime.now()
+            start_time = end_time - timedelta(seconds=total_duration)
             session_data = (
                 repo_path,
                 repo_name,
-                datetime.now() - timedelta(seconds=total_duration),
-                datetime.now(),
+                start_time.isoformat(" "),
+                end_time.isoformat(" "),
                 total_duration,
                 commit_hash,
                 commit_message,
@@ -534,14 +1169,18 @@ class EnhancedActivityTracker:
 
             try:
                 self.db.save_session(session_data)
-                verbose_print("✅ Session saved to database")
+                verbose_print("✅ Session queued for database")
             except Exception as e:
                 error_print(f"Failed to save session to database: {e}")
 
             # Save session to Markdown log
             try:
                 self.save_session_to_markdown(
-                    repo_path, total_duration, (commit_hash, commit_message)
+                    repo_path,
+                    total_duration,
+                    (commit_hash, commit_message),
+                    git_stats=git_stats,
+                    productivity_score=productivity_score,
                 )
                 verbose_print("✅ Session saved to Markdown")
             except Exception as e:
@@ -560,95 +1199,156 @@ class EnhancedActivityTracker:
             )
 
             # Reset counters
-            self.accumulated_time[repo_path] = 0
-            self.file_changes[repo_path] = set()  # Reset to empty set
+            state.accumulated = 0.0
+            state.files = set()
         else:
             verbose_print("No accumulated time found - session not saved")
 
-        self.last_commits[repo_path] = commit_hash
+        state.last_commit = commit_hash
+
+    def _get_commit_message(self, repo_path, commit_hash=None):
+        """Get the message of ``commit_hash`` (default: the latest commit).
+
+        The last message read per repository is kept, so repeated lookups of
+        the same commit don't touch git again.
+        """
+        if commit_hash is not None:
+            cached = self._commit_messages.get(repo_path)
+            if cached is not None and cached[0] == commit_hash:
+                return cached[1]
+
+        repo = self._open_repo(repo_path)
+        if repo is not None:
+            try:
+                target = repo.head.target if commit_hash is None else commit_hash
+                message = repo[target].message.strip()
+                verbose_print(f"Retrieved commit message: {message[:50]}...")
+                self._commit_messages[repo_path] = (str(target), message)
+                return message
+            except (pygit2.GitError, KeyError, ValueError) as e:
+                verbose_print(f"Failed to get commit message: {e}")
+                return "No commit message available"
 
-    def _get_commit_message(self, repo_path):
-        """Get the latest commit message."""
         try:
-            result = subprocess.check_output(
-                ["git", "-C", repo_path, "log", "-1", "--pretty=%B"],
-                stderr=subprocess.DEVNULL,
-            )
-            message = result.decode().strip()
+            commit = self._cat_file(repo_path, commit_hash or "HEAD")
+        except OSError as e:
+            verbose_print(f"{e}; falling back to git log")
+        else:
+            if commit is None or commit[1] != "commit":
+                verbose_print("Failed to get commit message: no commit")
+                return "No commit message available"
+            # The message follows the first blank line of the commit object
+            raw_message = commit[2].partition(b"\n\n")[2]
+            message = raw_message.decode("utf-8", "replace").strip()
             verbose_print(f"Retrieved commit message: {message[:50]}...")
+            self._commit_messages[repo_path] = (commit[0], message)
             return message
-        except subprocess.CalledProcessError as e:
-            verbose_print(f"Failed to get commit message: {e}")
+
+        output = _git(
+            repo_path,
+            "log",
+            "-1",
+            "--pretty=%B",
+            *([commit_hash] if commit_hash else []),
+        )
+        if output is None:
             return "No commit message available"
-        except Exception as e:
-            verbose_print(f"Unexpected error getting commit message: {e}")
-            return "Error retrieving commit message"
+        message = output.strip()
+        verbose_print(f"Retrieved commit message: {message[:50]}...")
+        if commit_hash is not None:
+            self._commit_messages[repo_path] = (commit_hash, message)
+        return message
 
     def _show_live_status(self):
         """Show live status of active sessions."""
-        active_count = len([k for k, (s, l) in self.active_sessions.items() if s])
-        accumulated_count = len([k for k, v in self.accumulated_time.items() if v > 0])
-
-        if active_count > 0 or accumulated_count > 0:
-            table = Table(title="📊 Current Activity Status")
-            table.add_column("Repository", style="cyan")
-            table.add_column("Status", style="green")
-            table.add_column("Time", style="yellow")
-            table.add_column("Files Changed", style="magenta")
+        if not self.repos:
+            return
 
-            # Show active sessions
-            for repo_path, (start, last) in self.active_sessions.items():
-                if start:
-                    duration = time.time() - start
-                    files = len(self.file_changes.get(repo_path, set()))
-                    table.add_row(
-                        os.path.basename(repo_path),
+        # One pass over the repositories; active rows are listed before
+        # accumulated ones, and a repository can appear in both
+        now = time.monotonic()
+        active_rows = []
+        accumulated_rows = []
+        for state in list(self.repos.values()):
+            if state.start:
+                active_rows.append(
+                    (
+                        state.name,
                         "🟢 Active",
-                        f"{duration/60:.1f}m",
-                        str(files),
+                        f"{(now - state.start)/60:.1f}m",
+                        str(len(state.files)),
                     )
-
-            # Show accumulated time
-            for repo_path, duration in self.accumulated_time.items():
-                if duration > 0:
-                    files = len(self.file_changes.get(repo_path, set()))
-                    table.add_row(
-                        os.path.basename(repo_path),
+                )
+            if state.accumulated > 0:
+                accumulated_rows.append(
+                    (
+                        state.name,
                         "🟡 Accumulated",
-                        f"{duration/60:.1f}m",
-                        str(files),
+                        f"{state.accumulated/60:.1f}m",
+                        str(len(state.files)),
                     )
+                )
 
+        if active_rows or accumulated_rows:
+            table = Table(title="📊 Current Activity Status")
+            table.add_column("Repository", style="cyan")
+            table.add_column("Status", style="green")
+            table.add_column("Time", style="yellow")
+            table.add_column("Files Changed", style="magenta")
+            for row in active_rows + accumulated_rows:
+                table.add_row(*row)
             console.print(table)
 
     def stop_monitoring(self):
         """Stop the monitoring process."""
         self.running = False
+        self._stop_event.set()
+        self._rescan_event.set()
         if self.observer:
             self.observer.stop()
             self.observer.join()
+        for repo_path in list(self._git_procs):
+            self._close_git_proc(repo_path)
+        self.db.flush()
         console.print("[red]🛑 Activity Monitor Stopped[/red]")
 
-    def save_session_to_markdown(self, repo_path, duration, commit_info=None):
-        """Save session data to daily Markdown file (legacy format + enhanced)."""
+    def _markdown_path(self, day):
+        """Return the daily markdown file for a date."""
+        return os.path.join(LOG_DIR, f"{day}.md")
+
+    def save_session_to_markdown(
+        self,
+        repo_path,
+        duration,
+        commit_info=None,
+        git_stats=None,
+        productivity_score=None,
+    ):
+        """Save session data to daily Markdown file (legacy format + enhanced).
+
+        ``git_stats`` (a get_git_stats() result) and ``productivity_score``
+        are computed here when the caller has not already done so.
+        """
         repo_name = os.path.basename(repo_path)
-        today_file = os.path.join(LOG_DIR, f"{datetime.now().date()}.md")
-
-        # Create daily file if it doesn't exist
-        if not os.path.exists(today_file):
-            with open(today_file, "w") as f:
-                f.write(f"# Daily Timesheet - {datetime.now().date()}\n\n")
-                f.write("## 📋 Task Summary\n\n")
-                f.write(
-                    "| Time | Task/Project | Repository | Duration | Files | Lines | Productivity | Status |\n"
-                )
-                f.write(
-                    "|------|-------------|------------|----------|-------|-------|--------------|--------|\n\n"
-                )
+        # One clock read, so the file, heading and row agree at midnight
+        now = datetime.now()
+        today = str(now.date())
+        today_file = self._markdown_path(today)
 
-        # Read existing content to check for task sections
-        with open(today_file, "r") as f:
-            content = f.read()
+        # Create daily file if it doesn't exist; otherwise collect the
+        # section headings of a file left by an earlier run, once per day
+        sections = self._markdown_sections.get(today)
+        if sections is None:
+            try:
+                with open(today_file, "r") as f:
+                    sections = set(re.findall(r"^## (.+)$", f.read(), re.M))
+            except FileNotFoundError:
+                with open(today_file, "w") as f:
+                    f.write(f"# Daily Timesheet - {today}\n\n")
+                    f.write("## 📋 Task Summary\n\n")
+                    f.write(_TASK_TABLE_HEAD + "\n")
+                sections = {"📋 Task Summary"}
+            self._markdown_sections[today] = sections
 
         # Get session details
         commit_hash, commit_message = (
@@ -658,39 +1358,31 @@ class EnhancedActivityTracker:
         # Extract task name from commit message
         task_name = extract_task_name(commit_message)
 
-        lines_added, lines_deleted, git_files_changed = self.get_git_stats(repo_path)
+        if git_stats is None:
+            git_stats = self.get_git_stats(repo_path)
+        lines_added, lines_deleted, git_files_changed = git_stats
         # Use the larger of file change counter or git stats for files changed
-        files_changed = max(
-            len(self.file_changes.get(repo_path, set())), git_files_changed
-        )
+        state = self.repos.get(repo_path)
+        files_changed = max(len(state.files) if state else 0, git_files_changed)
         total_lines = lines_added + lines_deleted
-        productivity_score = self.calculate_productivity_score(
-            duration, files_changed, total_lines
-        )
+        if productivity_score is None:
+            productivity_score = self.calculate_productivity_score(
+                duration, files_changed, total_lines
+            )
 
-        now = datetime.now()
         time_str = now.strftime("%H:%M")
         duration_str = f"{duration/60:.1f}min"
         status = "Committed" if commit_hash else "In Progress"
 
-        # Add to summary table (insert after the table header)
-        summary_line = f"| {time_str} | {task_name} | {repo_name} | {duration_str} | {files_changed} | {total_lines} | {productivity_score:.1f}/100 | {status} |\n"
-
-        # Insert summary line after table header
-        lines = content.split("\n")
-        table_end_idx = -1
-        for i, line in enumerate(lines):
-            if line.startswith("|------|"):
-                table_end_idx = i + 1
-                break
-
-        if table_end_idx > 0:
-            lines.insert(table_end_idx, summary_line.rstrip())
-            with open(today_file, "w") as f:
-                f.write("\n".join(lines))
+        # Add the row to the summary table right away, so the file is
+        # current after every session
+        summary_line = f"| {time_str} | {task_name} | {repo_name} | {duration_str} | {files_changed} | {total_lines} | {productivity_score:.1f}/100 | {status} |"
+        self._insert_summary_rows(today, [summary_line])
 
         # Add task section if it doesn't exist
-        if f"## {task_name}" not in content:
+        heading = f"📝 {task_name}"
+        if heading not in sections:
+            sections.add(heading)
             with open(today_file, "a") as f:
                 f.write(f"\n## 📝 {task_name}\n\n")
                 f.write(f"**Repository:** {repo_name}  \n")
@@ -719,25 +1411,74 @@ class EnhancedActivityTracker:
 
             if files_changed > 0:
                 # Try to get list of changed files
-                try:
-                    result = subprocess.run(
-                        ["git", "-C", repo_path, "diff", "--name-only"],
-                        capture_output=True,
-                        text=True,
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
-                        f.write("**Files modified:**\n")
-                        for file_name in result.stdout.strip().split("\n"):
-                            if file_name:
-                                f.write(f"- `{file_name}`\n")
-                        f.write("\n")
-                except:
-                    pass
+                file_names = self._get_unstaged_files(repo_path)
+                if file_names:
+                    f.write("**Files modified:**\n")
+                    for file_name in file_names:
+                        f.write(f"- `{file_name}`\n")
+                    f.write("\n")
 
             f.write("---\n\n")
 
         console.print(f"[green]📝 Markdown log updated: {today_file}")
 
+    def _insert_summary_rows(self, day, rows):
+        """Insert summary rows (oldest first) into a day's markdown table."""
+        today_file = self._markdown_path(day)
+        try:
+            with open(today_file) as f:
+                content = f.read()
+        except FileNotFoundError:
+            content = ""
+
+        # Newest sessions go first, directly below the table header; the
+        # header is near the top, so splice the text rather than splitting
+        # the whole day's log into lines
+        new_rows = "\n".join(reversed(rows))
+        header = 0 if content.startswith("|------|") else content.find("\n|------|")
+        if header == -1:
+            # No table (the file was edited by hand, removed, or written by an
+            # older version): start a new one at the end instead of dropping
+            # the rows
+            if not content:
+                content = f"# Daily Timesheet - {day}\n\n"
+            elif not content.endswith("\n\n"):
+                content = content.rstrip("\n") + "\n\n"
+            content += f"## 📋 Task Summary\n\n{_TASK_TABLE_HEAD}{new_rows}\n\n"
+        else:
+            end = content.find("\n", header + 1)
+            if end == -1:
+                content = f"{content}\n{new_rows}"
+            else:
+                content = f"{content[:end + 1]}{new_rows}\n{content[end + 1:]}"
+        tmp_file = today_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(content)
+        os.replace(tmp_file, today_file)
+
+    def render_markdown_tables(self):
+        """Move summary rows left queued by earlier versions into their tables.
+
+        Those versions kept rows in ``<date>.pending.jsonl`` files next to
+        the daily logs; each file is removed once its rows are written.
+        """
+        suffix = ".pending.jsonl"
+        try:
+            names = os.listdir(LOG_DIR)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(suffix):
+                continue
+            pending_file = os.path.join(LOG_DIR, name)
+            try:
+                with open(pending_file) as f:
+                    rows = [json.loads(line) for line in f if line.strip()]
+                self._insert_summary_rows(name[: -len(suffix)], rows)
+                os.remove(pending_file)
+            except (OSError, ValueError) as e:
+                error_print(f"Failed to render markdown table for {name}: {e}")
+
     def generate_markdown_summary(self, period="week"):
         """Generate weekly or monthly Markdown summary reports."""
         if period == "week":
@@ -752,7 +1493,7 @@ class EnhancedActivityTracker:
 
         # Get data from database
         df = self.db.get_daily_stats(days)
-        sessions_df = self.db.get_sessions(days)
+        repo_daily_df = self.db.get_repo_daily_stats(days)
 
         if df.empty:
             console.print(
@@ -760,6 +1501,16 @@ class EnhancedActivityTracker:
             )
             return
 
+        # Repository with the most time per date (ties go to the first name)
+        top_repo_by_date = (
+            repo_daily_df.sort_values(
+                "duration_seconds", ascending=False, kind="stable"
+            )
+            .drop_duplicates("date")
+            .set_index("date")["repo_name"]
+            .to_dict()
+        )
+
         # Create summary file
         now = datetime.now()
         if period == "week":
@@ -776,9 +1527,7 @@ class EnhancedActivityTracker:
             # Overview statistics
             total_hours = df["total_time"].sum() / 3600
             total_sessions = df["sessions_count"].sum()
-            total_repos = (
-                len(sessions_df["repo_name"].unique()) if not sessions_df.empty else 0
-            )
+            total_repos = repo_daily_df["repo_name"].nunique()
             avg_productivity = df["avg_productivity"].mean()
 
             f.write("## 📊 Overview\n\n")
@@ -790,64 +1539,63 @@ class EnhancedActivityTracker:
 
             # Daily breakdown table
             f.write("## 📅 Daily Breakdown\n\n")
-            f.write(
-                "| Date | Hours | Sessions | Repos | Productivity | Top Repository |\n"
-            )
-            f.write(
-                "|------|-------|----------|-------|--------------|----------------|\n"
-            )
-
-            for _, row in df.iterrows():
-                # Find top repo for this date
-                day_sessions = sessions_df[
-                    sessions_df["created_at"].str.contains(str(row["date"]))
-                ]
-                top_repo = "N/A"
-                if not day_sessions.empty:
-                    repo_times = day_sessions.groupby("repo_name")[
-                        "duration_seconds"
-                    ].sum()
-                    top_repo = repo_times.idxmax() if not repo_times.empty else "N/A"
-
-                f.write(
-                    f"| {row['date']} | {row['total_time']/3600:.1f}h | {row['sessions_count']} | {row['repos_count']} | {row['avg_productivity']:.1f} | {top_repo} |\n"
+            f.write(_DAILY_TABLE_HEAD)
+
+            rows = [
+                _DAILY_ROW_TMPL.format(
+                    date=row.date,
+                    hours=row.total_time / 3600,
+                    sessions=row.sessions_count,
+                    repos=row.repos_count,
+                    prod=row.avg_productivity,
+                    top=top_repo_by_date.get(row.date, "N/A"),
                 )
+                for row in df.itertuples(index=False)
+            ]
+            f.write("".join(rows))
 
             f.write("\n")
 
             # Repository analysis
-            if not sessions_df.empty:
+            if not repo_daily_df.empty:
                 f.write("## 📦 Repository Analysis\n\n")
-                repo_stats = (
-                    sessions_df.groupby("repo_name")
-                    .agg(
-                        {
-                            "duration_seconds": "sum",
-                            "id": "count",
-                            "productivity_score": "mean",
-                            "files_changed": "sum",
-                            "lines_added": "sum",
-                            "lines_deleted": "sum",
-                        }
-                    )
-                    .round(2)
+                repo_stats = repo_daily_df.groupby("repo_name").agg(
+                    {
+                        "duration_seconds": "sum",
+                        "sessions_count": "sum",
+                        "productivity_total": "sum",
+                        "files_changed": "sum",
+                        "lines_added": "sum",
+                        "lines_deleted": "sum",
+                    }
                 )
+                repo_stats["productivity_score"] = (
+                    repo_stats["productivity_total"] / repo_stats["sessions_count"]
+                ).round(2)
 
                 repo_stats["hours"] = repo_stats["duration_seconds"] / 3600
-                repo_stats = repo_stats.sort_values("hours", ascending=False)
-
-                f.write(
-                    "| Repository | Hours | Sessions | Avg Productivity | Files | Lines Changed |\n"
-                )
-                f.write(
-                    "|------------|-------|----------|------------------|-------|---------------|\n"
+                repo_stats["total_lines"] = (
+                    repo_stats["lines_added"] + repo_stats["lines_deleted"]
                 )
-
-                for repo, stats in repo_stats.iterrows():
-                    total_lines = stats["lines_added"] + stats["lines_deleted"]
-                    f.write(
-                        f"| {repo} | {stats['hours']:.1f}h | {stats['id']} | {stats['productivity_score']:.1f} | {stats['files_changed']} | {total_lines} |\n"
+                repo_stats = repo_stats.sort_values("hours", ascending=False)
+                # All-float rows, as iterrows() produced, so counts keep
+                # rendering as e.g. "12.0"
+                repo_stats = repo_stats.astype(float)
+
+                f.write(_REPO_TABLE_HEAD)
+
+                rows = [
+                    _REPO_ROW_TMPL.format(
+                        repo=stats.Index,
+                        hours=stats.hours,
+                        sessions=stats.sessions_count,
+                        prod=stats.productivity_score,
+                        files=stats.files_changed,
+                        lines=stats.total_lines,
                     )
+                    for stats in repo_stats.itertuples()
+                ]
+                f.write("".join(rows))
 
                 f.write("\n")
 
@@ -902,52 +1650,66 @@ class EnhancedChangeHandler(FileSystemEventHandler):
         verbose_print(f"File system handler initialized for: {MONITOR_PATH}")
 
     def on_modified(self, event):
+        # Runs for every event, so log messages are only built when verbose
         if event.is_directory:
-            verbose_print(f"Directory change ignored: {event.src_path}")
+            if VERBOSE:
+                verbose_print(f"Directory change ignored: {event.src_path}")
             return
 
-        verbose_print(f"File change detected: {event.src_path}")
+        if VERBOSE:
+            verbose_print(f"File change detected: {event.src_path}")
 
         # Skip certain file types
-        skip_extensions = {".pyc", ".log", ".tmp", ".swp", ".DS_Store"}
-        skip_paths = {".git", "__pycache__", "node_modules", ".vscode"}
+        if event.src_path.endswith(_SKIP_SUFFIXES):
+            if VERBOSE:
+                verbose_print(
+                    f"Skipped file (extension): {os.path.basename(event.src_path)}"
+                )
+            return
 
-        if any(event.src_path.endswith(ext) for ext in skip_extensions):
-            verbose_print(
-                f"Skipped file (extension): {os.path.basename(event.src_path)}"
-            )
+        if SKIP_PATH_RE.search("/" + event.src_path):
+            if VERBOSE:
+                verbose_print(f"Skipped file (path): {event.src_path}")
             return
 
-        if any(path_part in event.src_path for path_part in skip_paths):
-            verbose_print(f"Skipped file (path): {event.src_path}")
+        # Editors emit several events per save; count each burst once
+        touched = time.monotonic()
+        recent_touches = self.tracker.recent_touches
+        last_touch = recent_touches.get(event.src_path)
+        if last_touch is not None and touched - last_touch < EVENT_DEBOUNCE:
+            if VERBOSE:
+                verbose_print(f"Debounced file event: {event.src_path}")
             return
+        recent_touches[event.src_path] = touched
 
-        repo_path = get_repo_root(event.src_path)
+        # Directory events returned above, so skip get_repo_root's isfile()
+        # stat and go straight to the per-directory cache
+        repo_path = _repo_root_for_dir(os.path.dirname(event.src_path))
         if not repo_path:
-            verbose_print(f"Not in git repo: {event.src_path}")
+            if VERBOSE:
+                verbose_print(f"Not in git repo: {event.src_path}")
             return
 
-        debug_print(f"Processing change in repo: {os.path.basename(repo_path)}")
-
-        now = time.time()
-        start, last = self.tracker.active_sessions.get(repo_path, (None, None))
+        now = time.monotonic()
+        state = self.tracker.repos.get(repo_path)
+        if state is None:
+            state = self.tracker.repos[repo_path] = RepoState(
+                name=os.path.basename(repo_path)
+            )
+        debug_print(f"Processing change in repo: {state.name}")
 
         # Update file change set to track unique files
-        if repo_path not in self.tracker.file_changes:
-            self.tracker.file_changes[repo_path] = set()
-        self.tracker.file_changes[repo_path].add(event.src_path)
+        state.files.add(event.src_path)
 
-        if start is None:
-            self.tracker.active_sessions[repo_path] = (now, now)
-            info_print(f"🟢 Started session: {os.path.basename(repo_path)}")
-            verbose_print(
-                f"Session start time: {datetime.fromtimestamp(now).strftime('%H:%M:%S')}"
-            )
+        if state.start is None:
+            state.start = state.last = now
+            info_print(f"🟢 Started session: {state.name}")
+            verbose_print(f"Session start time: {datetime.now().strftime('%H:%M:%S')}")
         else:
-            self.tracker.active_sessions[repo_path] = (start, now)
-            session_duration = now - start
+            state.last = now
+            session_duration = now - state.start
             verbose_print(
-                f"Updated session: {os.path.basename(repo_path)} (active for {session_duration/60:.1f}min)"
+                f"Updated session: {state.name} (active for {session_duration/60:.1f}min)"
             )
 
     def on_created(self, event):
@@ -963,25 +1725,139 @@ class EnhancedChangeHandler(FileSystemEventHandler):
             verbose_print(f"File moved: {event.src_path} -> {event.dest_path}")
 
 
+class _MonitorRootHandler(FileSystemEventHandler):
+    """Request a repository rescan when a directory appears in MONITOR_PATH."""
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def on_created(self, event):
+        if event.is_directory:
+            self.tracker._rescan_event.set()
+
+    def on_moved(self, event):
+        if event.is_directory:
+            self.tracker._rescan_event.set()
+
+
 # Utility functions
+def _git(repo_path, *args):
+    """Run a git command in ``repo_path`` and return its stdout, or None.
+
+    stdin is closed and stderr discarded, and output is decoded as UTF-8 so
+    unusual bytes in paths or messages can't raise.
+    """
+    try:
+        return subprocess.check_output(
+            ["git", "-C", repo_path, *args],
+            stdin=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        verbose_print(f"git {args[0]} failed in {repo_path}: {e}")
+        return None
+
+
 def get_repo_root(path):
     """Get git repository root path."""
-    try:
-        if os.path.isfile(path):
-            path = os.path.dirname(path)
+    if os.path.isfile(path):
+        path = os.path.dirname(path)
+    return _repo_root_for_dir(path)
 
-        repo_root = (
-            subprocess.check_output(
-                ["git", "-C", path, "rev-parse", "--show-toplevel"],
-                stderr=subprocess.DEVNULL,
-            )
-            .decode()
-            .strip()
-        )
 
-        return repo_root
-    except subprocess.CalledProcessError:
+def _stat_key(path):
+    """Return (inode, mtime, size) of a file, or None if it does not exist.
+
+    git rewrites refs by renaming a lock file over them, so the inode
+    changes even when a rewrite lands within the mtime granularity.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
         return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+_OBJECT_ID_RE = re.compile(r"(?:[0-9a-f]{40}|[0-9a-f]{64})")
+
+
+def _is_object_id(value):
+    """Return True for a full SHA-1 or SHA-256 hex object id."""
+    return _OBJECT_ID_RE.fullmatch(value) is not None
+
+
+# {directory: repository root} for directories found inside a repository.
+# Misses are not stored, so a directory that later becomes a repository (git
+# init) is picked up; the repository rescan clears it when repositories
+# appear or disappear.
+_REPO_ROOTS = {}
+_REPO_ROOTS_MAX = 4096
+
+
+def _repo_root_for_dir(directory):
+    """Resolve (and memoize) the repository root containing a directory."""
+    root = _REPO_ROOTS.get(directory)
+    if root is None:
+        root = _find_repo_root(directory)
+        if root is not None:
+            if len(_REPO_ROOTS) >= _REPO_ROOTS_MAX:
+                _REPO_ROOTS.clear()
+            _REPO_ROOTS[directory] = root
+    return root
+
+
+def _find_repo_root(directory):
+    """Return the working tree root of the repository containing a directory."""
+    if PYGIT2_AVAILABLE:
+        git_dir = pygit2.discover_repository(directory)
+        if git_dir is None:
+            return None
+        try:
+            workdir = pygit2.Repository(git_dir).workdir
+        except pygit2.GitError:
+            return None
+        # Bare repositories have no working tree to track
+        return workdir.rstrip(os.sep) if workdir else None
+
+    output = _git(directory, "rev-parse", "--show-toplevel")
+    return output.strip() if output is not None else None
+
+
+def find_git_repos(root, max_depth=REPO_SCAN_DEPTH):
+    """Find git repositories at most ``max_depth`` directories below root.
+
+    Repositories are not descended into (their watch is recursive), and
+    hidden or skipped directories such as node_modules are pruned.
+    """
+    repos = []
+    root = root.rstrip(os.sep) or os.sep
+    # Depth-first, in the same order os.walk would visit directories, but
+    # without stat'ing plain files or listing a repository's own contents
+    stack = [(root, 0)]
+    while stack:
+        dirpath, depth = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if entry.name == ".git":
+                        break
+                    if (
+                        depth < max_depth
+                        and not entry.name.startswith(".")
+                        and entry.name not in SKIP_DIRS
+                        and entry.is_dir(follow_symlinks=False)
+                    ):
+                        subdirs.append(entry.path)
+                else:
+                    stack.extend((path, depth + 1) for path in reversed(subdirs))
+                    continue
+        except OSError:
+            continue
+        repos.append(dirpath)
+    return repos
 
 
 def extract_task_name(commit_message):
@@ -997,8 +1873,13 @@ def extract_task_name(commit_message):
     if not commit_message or commit_message.strip() == "":
         return "Unknown Task"
 
-    # Common task patterns to look for
-    patterns = [
+    return _extract_task_name(commit_message)
+
+
+# Common task patterns to look for, tried in order
+_TASK_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
         # JIRA-style: ABC-123, PROJ-456 (keep the full identifier)
         r"([A-Z]+-\d+)(?::\s*(.+))?",
         # GitHub issues: #123, fixes #456, closes #789 (with description)
@@ -1009,12 +1890,18 @@ def extract_task_name(commit_message):
         r"(?:feat(?:ure)?|fix|bug|chore|docs?|refactor|style|test):\s*([^,\n]+)",
         # Common verbs at start: Add, Fix, Update, Implement, etc.
         r"^((?:Add|Fix|Update|Implement|Create|Remove|Delete|Refactor|Optimize|Improve)[^,\n]*)",
-    ]
+    )
+]
+
 
-    import re
+@lru_cache(maxsize=1024)
+def _extract_task_name(commit_message):
+    """Match a non-empty commit message against _TASK_PATTERNS (memoized).
 
-    for pattern in patterns:
-        match = re.search(pattern, commit_message, re.IGNORECASE)
+    Reports see the same messages over and over, e.g. once per session.
+    """
+    for pattern in _TASK_PATTERNS:
+        match = pattern.search(commit_message)
         if match:
             groups = match.groups()
 
@@ -1059,13 +1946,13 @@ class Analytics:
     """Analytics and visualization for activity data."""
 
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = DatabaseManager.instance()
 
     def generate_daily_report(self, days=7):
         """Generate a daily activity report."""
-        df = self.db.get_daily_stats(days)
+        rows = self.db.get_daily_stats_rows(days)
 
-        if df.empty:
+        if not rows:
             console.print("[yellow]No data available for report[/yellow]")
             return
 
@@ -1078,7 +1965,7 @@ class Analytics:
         table.add_column("Lines", style="red")
         table.add_column("Productivity", style="bright_green")
 
-        for _, row in df.iterrows():
+        for row in rows:
             table.add_row(
                 str(row["date"]),
                 f"{row['total_time']/3600:.1f}h",
@@ -1099,6 +1986,8 @@ class Analytics:
             console.print("[yellow]No data available for charts[/yellow]")
             return
 
+        import plotly.graph_objects as go
+
         # Create plotly chart
         fig = go.Figure()
 
@@ -1135,44 +2024,127 @@ class Analytics:
         fig.write_html(chart_path)
         console.print(f"[green]📊 Chart saved to: {chart_path}[/green]")
 
-    def export_data(self, format="csv", days=30):
-        """Export activity data in various formats."""
+    def export_data(self, format="csv", days=30, compress=False):
+        """Export activity data in various formats.
+
+        Parquet and Feather need pyarrow. ``compress`` gzips CSV output.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        basepath = os.path.join(LOG_DIR, f"activity_export_{timestamp}")
+
+        if format.lower() == "csv":
+            # CSV is written straight from SQLite rows; no DataFrame needed
+            filepath = basepath + (".csv.gz" if compress else ".csv")
+            # Stream into a temp file and rename it on success, so a failed
+            # export never leaves a truncated file behind
+            tmp_path = filepath + ".tmp"
+            try:
+                if compress:
+                    # Level 1 is several times faster than gzip's default 9
+                    # and compresses this kind of data nearly as well
+                    f = gzip.open(tmp_path, "wt", compresslevel=1, newline="")
+                else:
+                    f = open(tmp_path, "w", newline="")
+                with f:
+                    count = self.db.write_sessions_csv(f, days)
+                if count:
+                    os.replace(tmp_path, filepath)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            if not count:
+                console.print("[yellow]No data to export[/yellow]")
+                return
+            console.print(f"[green]📄 Data exported to: {filepath}[/green]")
+            return
+
         df = self.db.get_sessions(days)
 
         if df.empty:
             console.print("[yellow]No data to export[/yellow]")
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        if format.lower() == "csv":
-            filepath = os.path.join(LOG_DIR, f"activity_export_{timestamp}.csv")
-            df.to_csv(filepath, index=False)
-        elif format.lower() == "json":
-            filepath = os.path.join(LOG_DIR, f"activity_export_{timestamp}.json")
-            df.to_json(filepath, orient="records", date_format="iso")
-        else:
-            console.print("[red]Unsupported export format[/red]")
+        try:
+            if format.lower() == "json":
+                filepath = basepath + ".json"
+                df.to_json(filepath, orient="records", date_format="iso")
+            elif format.lower() == "parquet":
+                filepath = basepath + ".parquet"
+                df.to_parquet(filepath, compression="zstd", index=False)
+            elif format.lower() == "feather":
+                filepath = basepath + ".feather"
+                df.to_feather(filepath)
+            else:
+                console.print("[red]Unsupported export format[/red]")
+                return
+        except ImportError as e:
+            console.print(f"[red]{format} export is unavailable: {e}[/red]")
             return
 
         console.print(f"[green]📄 Data exported to: {filepath}[/green]")
 
     def generate_pdf_report(self, days=30, report_type="comprehensive"):
         """Generate a comprehensive PDF report."""
-        if not PDF_AVAILABLE:
-            console.print("[red]❌ PDF libraries not available. Install with:[/red]")
-            console.print("pip install reportlab Pillow kaleido")
+        if not _reportlab():
+            _print_pdf_unavailable()
             return None
 
         return PDFReportGenerator(self.db).generate_report(days, report_type)
 
 
+def _print_pdf_unavailable():
+    """Tell the user how to install the PDF dependencies."""
+    console.print("[red]❌ PDF libraries not available. Install with:[/red]")
+    console.print("pip install reportlab Pillow kaleido")
+
+
 class PDFReportGenerator:
     """Generate PDF reports from activity data."""
 
     def __init__(self, db_manager):
+        if not _reportlab():
+            raise ImportError("PDF reports need reportlab (pip install reportlab)")
         self.db = db_manager
 
+        # Styles are only read while building a story, so every report
+        # generated by this instance shares one set
+        self._styles = getSampleStyleSheet()
+        self._title_style = ParagraphStyle(
+            "CustomTitle",
+            parent=self._styles["Heading1"],
+            fontSize=24,
+            spaceAfter=30,
+            textColor=HexColor("#2E86C1"),
+        )
+        self._heading_style = ParagraphStyle(
+            "CustomHeading",
+            parent=self._styles["Heading2"],
+            fontSize=16,
+            spaceBefore=20,
+            spaceAfter=10,
+            textColor=HexColor("#1B4F72"),
+        )
+        self._cell_style = self._get_cell_style()
+        self._table_styles = {
+            "summary": TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#3498DB")),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, 0), 12),
+                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#F8F9FA")),
+                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ]
+            ),
+            "daily": self._get_table_style("#E74C3C", "#FDEDEC"),
+            "repository": self._get_table_style("#27AE60", "#E8F8F5"),
+            "repo_timesheet": self._get_table_style("#2980B9", "#EBF5FB"),
+            "daily_timesheet": self._get_table_style("#16A085", "#E8F8F5"),
+            "monthly_timesheet": self._get_table_style("#8E44AD", "#F5EEF8"),
+        }
+
     def _get_cell_style(self):
         """Return a ParagraphStyle for table cells."""
         return ParagraphStyle(
@@ -1183,16 +2155,42 @@ class PDFReportGenerator:
             spaceAfter=2,
         )
 
+    def _get_table_style(self, header_color, body_color):
+        """Return a TableStyle for a centred table with a coloured header."""
+        return TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), HexColor(header_color)),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 10),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), HexColor(body_color)),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+
     def generate_report(self, days=30, report_type="comprehensive"):
         """Generate PDF report with charts and tables."""
         # Get data
         df = self.db.get_daily_stats(days)
-        sessions_df = self.db.get_sessions(days)
+        repo_daily_df = self.db.get_repo_daily_stats(days)
 
         if df.empty:
             console.print("[yellow]No data available for PDF report[/yellow]")
             return None
 
+        # Totals shared by the executive summary and the insights
+        totals = {
+            "hours": df["total_time"].sum() / 3600,
+            "sessions": df["sessions_count"].sum(),
+            "repos": repo_daily_df["repo_name"].nunique(),
+            "productivity": df["avg_productivity"].mean(),
+            "files": df["files_changed"].sum(),
+            "lines": df["lines_changed"].sum(),
+        }
+
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"activity_{report_type}_report_{timestamp}.pdf"
@@ -1201,16 +2199,16 @@ class PDFReportGenerator:
         # Create PDF document
         doc = SimpleDocTemplate(pdf_path, pagesize=letter)
         story = []
-        styles = getSampleStyleSheet()
+        styles = self._styles
 
         # Add content
-        self._add_title_and_summary(story, styles, df, sessions_df, days)
-        self._add_daily_breakdown(story, styles, df, sessions_df)
+        self._add_title_and_summary(story, styles, df, totals, days)
+        self._add_daily_breakdown(story, styles, df, repo_daily_df)
 
-        if report_type == "comprehensive" and not sessions_df.empty:
-            self._add_repository_analysis(story, styles, sessions_df)
+        if report_type == "comprehensive" and not repo_daily_df.empty:
+            self._add_repository_analysis(story, styles, repo_daily_df)
 
-        self._add_productivity_insights(story, styles, df, sessions_df)
+        self._add_productivity_insights(story, styles, df, totals)
         self._add_footer(story, styles)
 
         # Build PDF
@@ -1222,19 +2220,10 @@ class PDFReportGenerator:
             error_print(f"Error generating PDF: {e}")
             return None
 
-    def _add_title_and_summary(self, story, styles, df, sessions_df, days):
+    def _add_title_and_summary(self, story, styles, df, totals, days):
         """Add title and executive summary."""
-        # Custom styles
-        title_style = ParagraphStyle(
-            "CustomTitle",
-            parent=styles["Heading1"],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=HexColor("#2E86C1"),
-        )
-
         # Title
-        story.append(Paragraph("📊 Activity Monitor Report", title_style))
+        story.append(Paragraph("📊 Activity Monitor Report", self._title_style))
         story.append(
             Paragraph(
                 f"Report Period: {days} days (Generated: {datetime.now().strftime('%B %d, %Y')})",
@@ -1244,144 +2233,84 @@ class PDFReportGenerator:
         story.append(Spacer(1, 20))
 
         # Executive Summary
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=16,
-            spaceBefore=20,
-            spaceAfter=10,
-            textColor=HexColor("#1B4F72"),
-        )
-
-        story.append(Paragraph("📋 Executive Summary", heading_style))
-
-        # Calculate metrics
-        total_hours = df["total_time"].sum() / 3600
-        total_sessions = df["sessions_count"].sum()
-        total_repos = (
-            len(sessions_df["repo_name"].unique()) if not sessions_df.empty else 0
-        )
-        avg_productivity = df["avg_productivity"].mean()
-        total_files = df["files_changed"].sum()
-        total_lines = df["lines_changed"].sum()
+        story.append(Paragraph("📋 Executive Summary", self._heading_style))
 
         # Create summary table
         summary_data = [
             ["Metric", "Value"],
-            ["Total Coding Time", f"{total_hours:.1f} hours"],
-            ["Total Sessions", f"{total_sessions}"],
-            ["Repositories Worked On", f"{total_repos}"],
-            ["Average Productivity Score", f"{avg_productivity:.1f}/100"],
-            ["Files Modified", f"{total_files}"],
-            ["Lines Changed", f"{total_lines}"],
-            ["Average Daily Time", f"{total_hours/len(df):.1f} hours"],
+            ["Total Coding Time", f"{totals['hours']:.1f} hours"],
+            ["Total Sessions", f"{totals['sessions']}"],
+            ["Repositories Worked On", f"{totals['repos']}"],
+            ["Average Productivity Score", f"{totals['productivity']:.1f}/100"],
+            ["Files Modified", f"{totals['files']}"],
+            ["Lines Changed", f"{totals['lines']}"],
+            ["Average Daily Time", f"{totals['hours']/len(df):.1f} hours"],
         ]
 
         summary_table = RLTable(summary_data)
-        summary_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#3498DB")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 12),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#F8F9FA")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        summary_table.setStyle(self._table_styles["summary"])
 
         story.append(summary_table)
         story.append(Spacer(1, 20))
 
-    def _add_daily_breakdown(self, story, styles, df, sessions_df):
+    def _add_daily_breakdown(self, story, styles, df, repo_daily_df):
         """Add daily activity breakdown table."""
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=16,
-            spaceBefore=20,
-            spaceAfter=10,
-            textColor=HexColor("#1B4F72"),
-        )
-
-        story.append(Paragraph("📅 Daily Activity Breakdown", heading_style))
+        story.append(Paragraph("📅 Daily Activity Breakdown", self._heading_style))
 
         daily_data = [
             ["Date", "Hours", "Sessions", "Repos", "Productivity", "Top Repository"]
         ]
-        for _, row in df.iterrows():
-            # Find top repo for this date
-            day_sessions = sessions_df[
-                sessions_df["created_at"].str.contains(str(row["date"]))
-            ]
-            top_repo = "N/A"
-            if not day_sessions.empty:
-                repo_times = day_sessions.groupby("repo_name")["duration_seconds"].sum()
-                top_repo = repo_times.idxmax() if not repo_times.empty else "N/A"
-
-            daily_data.append(
-                [
-                    str(row["date"]),
-                    f"{row['total_time']/3600:.1f}h",
-                    str(row["sessions_count"]),
-                    str(row["repos_count"]),
-                    f"{row['avg_productivity']:.1f}/100",
-                    top_repo,
-                ]
+        # Repository with the most time per date (ties go to the first name)
+        top_repo_by_date = (
+            repo_daily_df.sort_values(
+                "duration_seconds", ascending=False, kind="stable"
             )
+            .drop_duplicates("date")
+            .set_index("date")["repo_name"]
+            .to_dict()
+        )
+
+        daily_data += [
+            [
+                str(row.date),
+                f"{row.total_time/3600:.1f}h",
+                str(row.sessions_count),
+                str(row.repos_count),
+                f"{row.avg_productivity:.1f}/100",
+                top_repo_by_date.get(str(row.date), "N/A"),
+            ]
+            for row in df.itertuples(index=False)
+        ]
 
         daily_table = RLTable(daily_data)
-        daily_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#E74C3C")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#FDEDEC")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        daily_table.setStyle(self._table_styles["daily"])
 
         story.append(daily_table)
         story.append(Spacer(1, 20))
 
-    def _add_repository_analysis(self, story, styles, sessions_df):
+    def _add_repository_analysis(self, story, styles, repo_daily_df):
         """Add repository analysis section."""
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=16,
-            spaceBefore=20,
-            spaceAfter=10,
-            textColor=HexColor("#1B4F72"),
+        story.append(Paragraph("📦 Repository Analysis", self._heading_style))
+
+        repo_stats = repo_daily_df.groupby("repo_name").agg(
+            {
+                "duration_seconds": "sum",
+                "sessions_count": "sum",
+                "productivity_total": "sum",
+                "files_changed": "sum",
+                "lines_added": "sum",
+                "lines_deleted": "sum",
+            }
         )
-
-        story.append(Paragraph("📦 Repository Analysis", heading_style))
-
-        repo_stats = (
-            sessions_df.groupby("repo_name")
-            .agg(
-                {
-                    "duration_seconds": "sum",
-                    "id": "count",
-                    "productivity_score": "mean",
-                    "files_changed": "sum",
-                    "lines_added": "sum",
-                    "lines_deleted": "sum",
-                }
-            )
-            .round(2)
+        repo_stats["productivity_score"] = (
+            repo_stats["productivity_total"] / repo_stats["sessions_count"]
         )
+        repo_stats = repo_stats.round(2)
 
         repo_stats["hours"] = repo_stats["duration_seconds"] / 3600
+        repo_stats["total_lines"] = (
+            repo_stats["lines_added"] + repo_stats["lines_deleted"]
+        )
         repo_stats = repo_stats.sort_values("hours", ascending=False)
 
         repo_data = [
@@ -1394,52 +2323,30 @@ class PDFReportGenerator:
                 "Lines Changed",
             ]
         ]
-        for repo, stats in repo_stats.head(10).iterrows():  # Top 10 repositories
-            total_lines = stats["lines_added"] + stats["lines_deleted"]
-            repo_data.append(
-                [
-                    repo[:20]
-                    + ("..." if len(repo) > 20 else ""),  # Truncate long names
-                    f"{stats['hours']:.1f}h",
-                    str(stats["id"]),
-                    f"{stats['productivity_score']:.1f}",
-                    str(stats["files_changed"]),
-                    str(int(total_lines)),
-                ]
-            )
+        # All-float rows, as iterrows() produced, so counts keep rendering
+        # as e.g. "12.0"
+        top_repos = repo_stats.head(10).astype(float)  # Top 10 repositories
+        repo_data += [
+            [
+                repo[:20] + ("..." if len(repo) > 20 else ""),  # Truncate long names
+                f"{stats.hours:.1f}h",
+                str(stats.sessions_count),
+                f"{stats.productivity_score:.1f}",
+                str(stats.files_changed),
+                str(int(stats.total_lines)),
+            ]
+            for repo, stats in zip(top_repos.index, top_repos.itertuples())
+        ]
 
         repo_table = RLTable(repo_data)
-        repo_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#27AE60")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#E8F8F5")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        repo_table.setStyle(self._table_styles["repository"])
 
         story.append(repo_table)
         story.append(Spacer(1, 20))
 
-    def _add_productivity_insights(self, story, styles, df, sessions_df):
+    def _add_productivity_insights(self, story, styles, df, totals):
         """Add productivity insights and recommendations."""
-        heading_style = ParagraphStyle(
-            "CustomHeading",
-            parent=styles["Heading2"],
-            fontSize=16,
-            spaceBefore=20,
-            spaceAfter=10,
-            textColor=HexColor("#1B4F72"),
-        )
-
-        story.append(Paragraph("🎯 Productivity Insights", heading_style))
+        story.append(Paragraph("🎯 Productivity Insights", self._heading_style))
 
         insights = []
         if len(df) > 1:
@@ -1456,21 +2363,15 @@ class PDFReportGenerator:
             )
 
         # Add recommendations
-        total_hours = df["total_time"].sum() / 3600
-        avg_productivity = df["avg_productivity"].mean()
-        total_repos = (
-            len(sessions_df["repo_name"].unique()) if not sessions_df.empty else 0
-        )
-
-        if total_hours < 40:
+        if totals["hours"] < 40:
             insights.append(
                 "• Consider setting daily time goals to increase coding time"
             )
-        if avg_productivity < 70:
+        if totals["productivity"] < 70:
             insights.append(
                 "• Focus on fewer projects at a time to improve productivity"
             )
-        if total_repos > 5:
+        if totals["repos"] > 5:
             insights.append(
                 "• Working on many projects can reduce overall productivity"
             )
@@ -1493,6 +2394,7 @@ class PDFReportGenerator:
 
     def generate_repo_timesheet(self, days=30, repo=None):
         """Generate a PDF timesheet grouped by repository, showing task names."""
+        pd = _pandas()
         df = self.db.get_sessions(days)
         if repo:
             df = df[df["repo_name"] == repo]
@@ -1504,7 +2406,7 @@ class PDFReportGenerator:
         pdf_path = os.path.join(LOG_DIR, filename)
         doc = SimpleDocTemplate(pdf_path, pagesize=letter)
         story = []
-        styles = getSampleStyleSheet()
+        styles = self._styles
         title = f"Repository Timesheet{' for ' + repo if repo else ''}"
         story.append(Paragraph(title, styles["Title"]))
         story.append(Spacer(1, 20))
@@ -1520,60 +2422,37 @@ class PDFReportGenerator:
                 "Commit",
             ]
         ]
-        cell_style = self._get_cell_style()
-
-        for _, row in df.iterrows():
-            start = (
-                pd.to_datetime(row["start_time"]).strftime("%Y-%m-%d %H:%M")
-                if row["start_time"]
-                else ""
-            )
-            end = (
-                pd.to_datetime(row["end_time"]).strftime("%Y-%m-%d %H:%M")
-                if row["end_time"]
-                else ""
-            )
-            duration = (
-                f"{row['duration_seconds']/60:.1f}" if row["duration_seconds"] else ""
-            )
+        cell_style = self._cell_style
+
+        # Timestamps are parsed and formatted a column at a time
+        rows = zip(
+            df["repo_name"],
+            _format_timestamps(df["created_at"], "%Y-%m-%d"),
+            _format_timestamps(df["start_time"], "%Y-%m-%d %H:%M"),
+            _format_timestamps(df["end_time"], "%Y-%m-%d %H:%M"),
+            df["duration_seconds"],
+            df["commit_message"],
+            df["commit_hash"],
+        )
+        for repo_name, date, start, end, seconds, commit_msg, commit_hash in rows:
+            duration = f"{seconds/60:.1f}" if seconds else ""
             # Extract task name from commit message
-            commit_msg = row.get("commit_message", "")
             task_name = extract_task_name(
                 str(commit_msg) if pd.notna(commit_msg) else "General Work"
             )
             data.append(
                 [
-                    Paragraph(row["repo_name"], cell_style),
-                    Paragraph(
-                        pd.to_datetime(row["created_at"]).strftime("%Y-%m-%d"),
-                        cell_style,
-                    ),
+                    Paragraph(repo_name, cell_style),
+                    Paragraph(date, cell_style),
                     Paragraph(start, cell_style),
                     Paragraph(end, cell_style),
                     Paragraph(duration, cell_style),
                     Paragraph(task_name, cell_style),
-                    Paragraph(
-                        str(row["commit_hash"])[0:7] if row["commit_hash"] else "",
-                        cell_style,
-                    ),
+                    Paragraph(str(commit_hash)[0:7] if commit_hash else "", cell_style),
                 ]
             )
         table = RLTable(data)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#2980B9")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#EBF5FB")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        table.setStyle(self._table_styles["repo_timesheet"])
         story.append(table)
         story.append(Spacer(1, 20))
         story.append(
@@ -1595,6 +2474,7 @@ class PDFReportGenerator:
 
     def generate_daily_timesheet(self, days=30, repo=None):
         """Generate a PDF timesheet grouped by day, showing task names."""
+        pd = _pandas()
         df = self.db.get_sessions(days)
         if repo:
             df = df[df["repo_name"] == repo]
@@ -1606,7 +2486,7 @@ class PDFReportGenerator:
         pdf_path = os.path.join(LOG_DIR, filename)
         doc = SimpleDocTemplate(pdf_path, pagesize=letter)
         story = []
-        styles = getSampleStyleSheet()
+        styles = self._styles
         title = f"Daily Timesheet{' for ' + repo if repo else ''}"
         story.append(Paragraph(title, styles["Title"]))
         story.append(Spacer(1, 20))
@@ -1614,7 +2494,7 @@ class PDFReportGenerator:
         df["date"] = pd.to_datetime(df["created_at"]).dt.date
         grouped = df.groupby("date")
         data = [["Date", "Total Time (h)", "Tasks", "Repositories"]]
-        cell_style = self._get_cell_style()
+        cell_style = self._cell_style
 
         for date, group in grouped:
             total_time = group["duration_seconds"].sum() / 3600
@@ -1636,21 +2516,7 @@ class PDFReportGenerator:
                 ]
             )
         table = RLTable(data)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#16A085")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#E8F8F5")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        table.setStyle(self._table_styles["daily_timesheet"])
         story.append(table)
         story.append(Spacer(1, 20))
         story.append(
@@ -1674,6 +2540,7 @@ class PDFReportGenerator:
 
     def generate_monthly_timesheet(self, repo=None):
         """Generate a PDF timesheet grouped by month, showing task names."""
+        pd = _pandas()
         df = self.db.get_sessions(365)  # Get up to a year
         if repo:
             df = df[df["repo_name"] == repo]
@@ -1689,12 +2556,12 @@ class PDFReportGenerator:
         pdf_path = os.path.join(LOG_DIR, filename)
         doc = SimpleDocTemplate(pdf_path, pagesize=letter)
         story = []
-        styles = getSampleStyleSheet()
+        styles = self._styles
         title = f"Monthly Timesheet{' for ' + repo if repo else ''}"
         story.append(Paragraph(title, styles["Title"]))
         story.append(Spacer(1, 20))
         data = [["Month", "Total Time (h)", "Tasks", "Repositories"]]
-        cell_style = self._get_cell_style()
+        cell_style = self._cell_style
 
         for month, group in grouped:
             total_time = group["duration_seconds"].sum() / 3600
@@ -1716,21 +2583,7 @@ class PDFReportGenerator:
                 ]
             )
         table = RLTable(data)
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#8E44AD")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 8),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), HexColor("#F5EEF8")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ]
-            )
-        )
+        table.setStyle(self._table_styles["monthly_timesheet"])
         story.append(table)
         story.append(Spacer(1, 20))
         story.append(
@@ -1770,11 +2623,12 @@ def cmd_start(verbose=False):
     info_print("Press Ctrl+C to stop monitoring")
     verbose_print("Monitoring loop starting...")
 
+    # Always stop cleanly so queued sessions and summary rows are written
     try:
-        while tracker.running:
-            time.sleep(1)
+        tracker.run()
     except KeyboardInterrupt:
         info_print("Stopping monitor...")
+    finally:
         tracker.stop_monitoring()
 
 
@@ -1784,11 +2638,11 @@ def cmd_status():
     analytics = Analytics()
 
     try:
-        db = DatabaseManager()
-        recent_sessions = db.get_sessions(1)  # Last 1 day
+        db = DatabaseManager.instance()
+        recent_sessions = db.get_recent_sessions_rows(1, 10)  # Last 1 day
 
-        if not recent_sessions.empty:
-            info_print(f"Found {len(recent_sessions)} recent sessions")
+        if recent_sessions:
+            info_print(f"Found {recent_sessions[0]['total_sessions']} recent sessions")
 
             # Show recent commits table
             table = Table(title="🔄 Recent Activity")
@@ -1798,7 +2652,7 @@ def cmd_status():
             table.add_column("Commit Message", style="blue")
             table.add_column("Productivity", style="magenta")
 
-            for _, session in recent_sessions.head(10).iterrows():
+            for session in recent_sessions:
                 duration = f"{session['duration_seconds']/60:.1f}min"
                 commit_msg = (
                     session["commit_message"][:40] + "..."
@@ -1806,10 +2660,9 @@ def cmd_status():
                     else str(session["commit_message"])
                 )
                 productivity = f"{session['productivity_score']:.1f}/100"
-                created_time = pd.to_datetime(session["created_at"]).strftime("%H:%M")
 
                 table.add_row(
-                    created_time,
+                    session["created_time"],
                     session["repo_name"],
                     duration,
                     commit_msg,
@@ -1838,10 +2691,7 @@ def cmd_test():
     info_print(f"✅ Monitor path exists: {MONITOR_PATH}")
 
     # Check for git repos
-    git_repos = []
-    for root, dirs, files in os.walk(MONITOR_PATH):
-        if ".git" in dirs:
-            git_repos.append(root)
+    git_repos = find_git_repos(MONITOR_PATH)
 
     if git_repos:
         info_print(f"✅ Found {len(git_repos)} Git repositories:")
@@ -1857,12 +2707,11 @@ def cmd_debug():
 
     # Check database
     try:
-        db = DatabaseManager()
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM activity_sessions")
-        session_count = cursor.fetchone()[0]
-        conn.close()
+        db = DatabaseManager.instance()
+        with db._lock:
+            session_count = db.conn.execute(
+                "SELECT COUNT(*) FROM activity_sessions"
+            ).fetchone()[0]
         info_print(f"✅ Database sessions: {session_count}")
     except Exception as e:
         error_print(f"Database error: {e}")
@@ -1885,22 +2734,26 @@ def cmd_report(days=30):
     analytics.generate_productivity_chart(days)
 
 
-def cmd_export(format="csv", days=30):
+def cmd_export(format="csv", days=30, compress=False):
     """Export activity data."""
     analytics = Analytics()
-    analytics.export_data(format, days)
+    analytics.export_data(format, days, compress)
 
 
 def cmd_pdf(days=30, report_type="comprehensive", sheet="default", repo=None):
     """Generate PDF report or timesheet."""
     analytics = Analytics()
-    pdfgen = PDFReportGenerator(analytics.db)
-    if sheet == "repo":
-        pdf_path = pdfgen.generate_repo_timesheet(days, repo)
-    elif sheet == "daily":
-        pdf_path = pdfgen.generate_daily_timesheet(days, repo)
-    elif sheet == "monthly":
-        pdf_path = pdfgen.generate_monthly_timesheet(repo)
+    if sheet in ("repo", "daily", "monthly"):
+        if not _reportlab():
+            _print_pdf_unavailable()
+            return
+        pdfgen = PDFReportGenerator(analytics.db)
+        if sheet == "repo":
+            pdf_path = pdfgen.generate_repo_timesheet(days, repo)
+        elif sheet == "daily":
+            pdf_path = pdfgen.generate_daily_timesheet(days, repo)
+        else:
+            pdf_path = pdfgen.generate_monthly_timesheet(repo)
     else:
         pdf_path = analytics.generate_pdf_report(days, report_type)
     if pdf_path:
@@ -2100,7 +2953,7 @@ Charts are saved to the log directory as 'productivity_chart.html'.
     export_parser = subparsers.add_parser(
         "export",
         help="Export activity data in various formats",
-        description="📤 Export your coding activity data to CSV or JSON files for further analysis, integration with other tools, or backup purposes.",
+        description="📤 Export your coding activity data to CSV, JSON, Parquet or Feather files for further analysis, integration with other tools, or backup purposes.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -2109,6 +2962,8 @@ Examples:
   %(prog)s export --format json             Export as JSON format  
   %(prog)s export --days 7                  Export last 7 days
   %(prog)s export --format json --days 14   Export last 14 days as JSON
+  %(prog)s export --format parquet          Export as Parquet (needs pyarrow)
+  %(prog)s export --compress                Export as gzip-compressed CSV
 
 Exported data includes:
   • Repository names and file paths
@@ -2123,9 +2978,14 @@ Files are saved with timestamps in the log directory.
     )
     export_parser.add_argument(
         "--format",
-        choices=["csv", "json"],
+        choices=["csv", "json", "parquet", "feather"],
         default="csv",
-        help="Export format: 'csv' for spreadsheet compatibility or 'json' for programmatic use",
+        help="Export format: 'csv' for spreadsheet compatibility, 'json' for programmatic use, or 'parquet'/'feather' for fast, compact columnar files (need pyarrow)",
+    )
+    export_parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Gzip the CSV export (fast compression level)",
     )
     export_parser.add_argument(
         "--days", type=int, default=30, help="Number of days to export (default: 30)"
@@ -2217,7 +3077,7 @@ All PDFs are saved with timestamps in your log directory.
     elif args.command == "report":
         cmd_report(args.days)
     elif args.command == "export":
-        cmd_export(args.format, args.days)
+        cmd_export(args.format, args.days, args.compress)
     elif args.command == "pdf":
         cmd_pdf(args.days, args.type, args.sheet, args.repo)
     elif args.command == "debug":
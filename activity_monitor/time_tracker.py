@@ -24,10 +24,16 @@ import threading
 import signal
 import sys
 
+# Prefer the LibYAML-backed C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _LOADER
+except ImportError:
+    from yaml import SafeLoader as _LOADER
+
 # Load config from config.yaml
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.yaml")
-with open(CONFIG_PATH, "r") as f:
-    config = yaml.safe_load(f)
+with open(CONFIG_PATH, "rb") as f:
+    config = yaml.load(f, Loader=_LOADER) or {}
 
 IDLE_THRESHOLD = config.get("idle_threshold", 300)
 SCAN_INTERVAL = config.get("scan_interval", 3)
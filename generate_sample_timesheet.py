@@ -17,7 +17,7 @@ def generate_sample_timesheet():
     """Generate a sample timesheet for testing."""
     print("📋 Generating Sample Daily Timesheet...")
 
-    db = DatabaseManager()
+    db = DatabaseManager.instance()
     tracker = EnhancedActivityTracker()
 
     # Get some recent sessions to create a realistic timesheet
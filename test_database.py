@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the session write queue of the database manager
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from activity_monitor import enhanced_tracker
+
+
+def test_flush_drops_failing_row(tmp_path, monkeypatch):
+    """A row the database rejects must not block the rest of the queue."""
+    monkeypatch.setattr(enhanced_tracker, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(enhanced_tracker, "DB_PATH", str(tmp_path / "test.db"))
+
+    def session(repo_path, repo_name):
+        return (
+            repo_path,
+            repo_name,
+            "2024-01-01 09:00:00",
+            "2024-01-01 10:00:00",
+            3600,
+            "abc1234",
+            "feat: work",
+            1,
+            2,
+            3,
+            50.0,
+        )
+
+    db = enhanced_tracker.DatabaseManager()
+    db.save_session(session("/tmp/good", "good"))
+    db.save_session(session(None, "bad"))  # violates NOT NULL on repo_path
+    db.save_session(session("/tmp/after", "after"))
+    db.flush()
+
+    names = [
+        row[0]
+        for row in db.conn.execute(
+            "SELECT repo_name FROM activity_sessions ORDER BY id"
+        )
+    ]
+    assert names == ["good", "after"]
+    assert db._pending == []
+
+    # The queue keeps working after the failure
+    db.save_session(session("/tmp/later", "later"))
+    db.flush()
+    assert db.conn.execute("SELECT COUNT(*) FROM activity_sessions").fetchone() == (3,)
@@ -5,10 +5,12 @@ Test the task extraction and markdown generation
 
 import os
 import sys
+from datetime import datetime
 
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from activity_monitor import enhanced_tracker
 from activity_monitor.enhanced_tracker import (
     extract_task_name,
     EnhancedActivityTracker,
@@ -16,7 +18,6 @@ from activity_monitor.enhanced_tracker import (
 )
 
 
-
 def test_task_extraction():
     """Test the task extraction function."""
     print("🧪 Testing Task Extraction...")
@@ -46,7 +47,7 @@ def test_markdown_generation():
     print("\n📝 Testing Markdown Generation...")
 
     # Get some real data from the database
-    db = DatabaseManager()
+    db = DatabaseManager.instance()
     recent_sessions = db.get_sessions(1)  # Get recent sessions
 
     if recent_sessions.empty:
@@ -90,6 +91,59 @@ def test_markdown_generation():
         traceback.print_exc()
 
 
+def test_task_section_written_once(tmp_path, monkeypatch):
+    """Two sessions for the same task on one day share one task section."""
+    monkeypatch.setattr(enhanced_tracker, "LOG_DIR", str(tmp_path))
+
+    tracker = EnhancedActivityTracker()
+    for _ in range(2):
+        tracker.save_session_to_markdown(
+            repo_path="/tmp/sample-repo",
+            duration=600,
+            commit_info=("abc1234def", "feat: Add user authentication system"),
+            git_stats=(0, 0, 0),
+        )
+
+    # A fresh tracker must pick the heading up from the existing file
+    EnhancedActivityTracker().save_session_to_markdown(
+        repo_path="/tmp/sample-repo",
+        duration=600,
+        commit_info=("abc1234def", "feat: Add user authentication system"),
+        git_stats=(0, 0, 0),
+    )
+
+    today_file = tmp_path / f"{datetime.now().date()}.md"
+    content = today_file.read_text()
+    task_name = extract_task_name("feat: Add user authentication system")
+    assert content.count(f"\n## 📝 {task_name}\n") == 1
+    assert content.count("- Work Session (10.0min)") == 3
+
+
+def test_summary_rows_kept_without_table(tmp_path, monkeypatch):
+    """Summary rows survive a daily file that lost its table."""
+    monkeypatch.setattr(enhanced_tracker, "LOG_DIR", str(tmp_path))
+
+    today_file = tmp_path / f"{datetime.now().date()}.md"
+    today_file.write_text("# My notes\n\nEdited by hand.\n")
+
+    tracker = EnhancedActivityTracker()
+    for message in ("feat: first change", "fix: second change"):
+        tracker.save_session_to_markdown(
+            repo_path="/tmp/sample-repo",
+            duration=600,
+            commit_info=("abc1234def", message),
+            git_stats=(0, 0, 0),
+        )
+
+    content = today_file.read_text()
+    assert content.startswith("# My notes\n\nEdited by hand.\n\n## 📋 Task Summary")
+    assert content.count("|------|") == 1
+    first = content.index(f"| {extract_task_name('feat: first change')} |")
+    second = content.index(f"| {extract_task_name('fix: second change')} |")
+    assert second < first  # newest row first
+    assert sorted(path.name for path in tmp_path.iterdir()) == [today_file.name]
+
+
 def main():
     """Main test function."""
     print("🚀 Task Extraction & Markdown Generation Test")